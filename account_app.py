@@ -1,8 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
 from datetime import datetime
-from PIL import Image, ImageTk
-import os
 
 transactions = []
 
@@ -55,11 +52,14 @@ def show_entry_dialog():
             update_displays()
             dialog.destroy()
         except ValueError:
+            from tkinter import messagebox
             messagebox.showerror("Error", "Please enter a valid amount")
     
     tk.Button(dialog, text="Save", command=save_entry).pack(pady=20)
 
 def show_history():
+    from tkinter import ttk
+    
     dialog = tk.Toplevel(root)
     dialog.title("Book History")
     dialog.geometry("400x300")
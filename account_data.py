@@ -1,18 +1,480 @@
 """Module for managing account data and calculations"""
-from datetime import datetime, date, timedelta
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Sequence
+from itertools import islice
+from calendar import monthrange
+from datetime import datetime, date
+from functools import lru_cache
+from ledger import (EPOCH, HEADER_SIZE, Ledger, LedgerError, LedgerRecord,
+                    OP_ADD, OP_EDIT, OP_DELETE, read_segments)
+from transaction_store import (TransactionStore, INCOME, PAID, DELETED,
+                               month_of, to_cents, to_timestamp)
+from fenwick import DayTotals
+from events import (EventBus, TransactionAdded, TransactionEdited, TransactionDeleted,
+                    TransactionsAdded, MonthChange, MonthRolledOver)
+from ledger_snapshot import (SNAPSHOT_SUFFIX, SnapshotError, list_snapshots,
+                             open_snapshot, snapshot_path, write_snapshot)
+
+_EPOCH_ORDINAL = EPOCH.toordinal()
+
+# Compact the ledger into a new snapshot once this many records follow the
+# last one, which bounds how much a restart has to replay
+COMPACT_AFTER_RECORDS = 50000
+
+@lru_cache(maxsize=None)
+def month_range_label(year: int, month: int) -> str:
+    """Range label for a month, e.g. '10/1 - 10/31' (computed once per month)"""
+    return f"{month}/1 - {month}/{monthrange(year, month)[1]}"
+
+def _split_totals(cents, code):
+    """(income, paid) cents contributed by one transaction"""
+    if code == INCOME:
+        return cents, 0
+    if code == PAID:
+        return 0, cents
+    return 0, 0
+
+def _display_position(bucket, index):
+    """Newest-first position of a row within its month bucket"""
+    return len(bucket.rows) - 1 - bisect_left(bucket.rows, index)
+
+def shift_month(year: int, month: int, delta: int):
+    """Get the (year, month) delta months away"""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+class ConsistencyError(Exception):
+    """Raised when running totals disagree with a full recompute"""
+
+class MonthBucket:
+    """Row indices and income/paid rollups (in cents) for one calendar month"""
+    __slots__ = ('rows', 'income', 'paid')
+    
+    def __init__(self, rows=None, income=0, paid=0):
+        # An array, or a read-only view into a snapshot until first changed
+        self.rows = array('I') if rows is None else rows
+        self.income = income
+        self.paid = paid
+    
+    def writable_rows(self):
+        """Get rows as a growable array, copying them out of a snapshot once"""
+        if not isinstance(self.rows, array):
+            rows = array('I')
+            rows.frombytes(self.rows.cast('B'))
+            self.rows = rows
+        return self.rows
+    
+    @property
+    def total(self):
+        return self.income - self.paid
+
+class MonthRows(Sequence):
+    """Live, newest-first view of one month's transactions"""
+    
+    def __init__(self, store, bucket):
+        self._store = store
+        self._bucket = bucket
+    
+    def __len__(self):
+        return len(self._bucket.rows)
+    
+    def __getitem__(self, position):
+        rows = self._bucket.rows
+        if isinstance(position, slice):
+            return [self[i] for i in range(len(rows))[position]]
+        if position < 0:
+            position += len(rows)
+        if not 0 <= position < len(rows):
+            raise IndexError("month row out of range")
+        return self._store[rows[len(rows) - 1 - position]]
+    
+    def position_of(self, row_id: int) -> int:
+        """Find the display position of a transaction id in O(log n)"""
+        rows = self._bucket.rows
+        i = bisect_left(rows, row_id)
+        if i == len(rows) or rows[i] != row_id:
+            raise ValueError(f"Transaction {row_id} is not in this month")
+        return len(rows) - 1 - i
 
 class AccountData:
-    def __init__(self):
-        self.transactions = []
+    def __init__(self, ledger_path: str = None, check_consistency: bool = False):
+        self.transactions = TransactionStore()
+        self.ledger = None
+        
+        # Running aggregates in cents, kept in step with every insert
+        self._income = 0
+        self._paid = 0
+        self.check_consistency = check_consistency
+        
+        # Transactions indexed by (year, month)
+        self._months = {}
+        
+        # Per-day range-sum index, built on the first range query
+        self._day_totals = None
+        
+        # Change events for views and other listeners; replaying history
+        # publishes nothing
+        self.events = EventBus()
+        today = date.today()
+        self._calendar_month = (today.year, today.month)
+        
+        # Reload history from the newest snapshot and the ledger records
+        # written after it, then write new entries through
+        self._snapshot_position = None
+        self._tail_records = 0
+        self._compactor = None
+        if ledger_path is not None:
+            self.ledger = Ledger(ledger_path)
+            try:
+                self._load_snapshot()
+                segment, offset = self._snapshot_position or (None, None)
+                for record in self.ledger.replay(offset, segment):
+                    self._apply_record(record)
+                    self._tail_records += 1
+            except BaseException:
+                # Let go of the ledger's lock
+                self.ledger.close()
+                raise
+            if self._tail_records >= COMPACT_AFTER_RECORDS:
+                self.compact()
+    
+    def _apply_record(self, record):
+        if record.op == OP_ADD:
+            self._append(to_cents(record.amount), record.category,
+                         record.description, to_timestamp(record.date))
+        elif record.op == OP_EDIT:
+            self._edit(record.row, to_cents(record.amount),
+                       record.category, record.description)
+        elif record.op == OP_DELETE:
+            self._delete(record.row)
+    
+    def _load_snapshot(self):
+        """Adopt the newest snapshot that was taken from this ledger"""
+        # The single unnumbered snapshot of older versions is never read; the
+        # ledger it was taken from is still whole, so it can just go
+        try:
+            os.remove(self.ledger.path + SNAPSHOT_SUFFIX)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not remove old snapshot: {e}")
+        for segment, path in list_snapshots(self.ledger.path):
+            try:
+                snapshot = open_snapshot(path)
+            except SnapshotError as e:
+                print(f"Ignoring snapshot: {e}")
+                continue
+            if (snapshot.ledger_segment == segment
+                    and self.ledger.fingerprint(snapshot.ledger_offset, segment)
+                    == snapshot.fingerprint):
+                self._adopt_snapshot(snapshot)
+                return
+    
+    def _adopt_snapshot(self, snapshot):
+        self.transactions = snapshot.store
+        self._income = snapshot.income
+        self._paid = snapshot.paid
+        self._months = {key: MonthBucket(rows, income, paid)
+                        for key, (income, paid, rows) in snapshot.months.items()}
+        self._snapshot_position = (snapshot.ledger_segment, snapshot.ledger_offset)
+    
+    def _logged(self, count):
+        """Count records written since the last compaction; compact when there are many"""
+        self._tail_records += count
+        if self._tail_records >= COMPACT_AFTER_RECORDS:
+            self.compact()
+    
+    def compact(self):
+        """
+        Fold the ledger written so far into a new snapshot on a background
+        thread. Entry carries on meanwhile: new records go to a fresh ledger
+        segment, which is all that later opens have to replay.
+        Returns the compaction thread, or None if one is already running.
+        """
+        if self.ledger is None or (self._compactor is not None
+                                   and self._compactor.is_alive()):
+            return None
+        self._tail_records = 0
+        self._compactor = threading.Thread(target=self._compact,
+                                           args=(self._snapshot_position,),
+                                           name="ledger-compaction", daemon=True)
+        self._compactor.start()
+        return self._compactor
+    
+    def _compact(self, position):
+        """
+        Rebuild the state as of a ledger rotation from files alone, namely the
+        previous snapshot plus the closed segments after it, and never touch the
+        live columns. A crash at any point leaves either the old snapshot
+        and all its segments, or the new snapshot, to open from.
+        """
+        ledger = self.ledger
+        try:
+            segment = ledger.rotate()
+            state = AccountData()
+            first_segment, start = position or (0, None)
+            if position is not None:
+                state._adopt_snapshot(open_snapshot(snapshot_path(ledger.path,
+                                                                  first_segment)))
+            for record in read_segments(ledger.path, first_segment, start, segment):
+                state._apply_record(record)
+            self._write_compacted(state, segment)
+        except (OSError, ValueError, LedgerError, SnapshotError) as e:
+            # The ledger alone is complete; the next open just replays more
+            print(f"Ledger compaction failed: {e}")
+    
+    def _write_compacted(self, state, segment):
+        """Snapshot state as of the start of segment, then drop what it replaces"""
+        ledger = self.ledger
+        write_snapshot(snapshot_path(ledger.path, segment), state.transactions,
+                       state._months, state._income, state._paid, segment,
+                       HEADER_SIZE, ledger.fingerprint(HEADER_SIZE, segment))
+        self._snapshot_position = (segment, HEADER_SIZE)
+        
+        ledger.remove_segments(segment)
+        for older, path in list_snapshots(ledger.path):
+            if older < segment:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # Still mapped (Windows); removed by a later compaction
+    
+    def _append(self, cents, category, description, timestamp):
+        index = self.transactions.append(cents, timestamp, category, description)
+        bucket = self._month_bucket(*month_of(timestamp), create=True)
+        bucket.writable_rows().append(index)
+        self._apply_totals(cents, self.transactions.categories[index], 1, bucket,
+                           timestamp)
+        return index
+    
+    def _live_row(self, index):
+        """Get the month bucket of a row, checking that the row exists"""
+        store = self.transactions
+        if not 0 <= index < len(store) or store.categories[index] == DELETED:
+            raise ValueError(f"No transaction with id {index}")
+        return self._month_bucket(*month_of(store.timestamps[index]))
+    
+    def _edit(self, index, cents, category, description):
+        store = self.transactions
+        bucket = self._live_row(index)
+        timestamp = store.timestamps[index]
+        self._apply_totals(store.amounts[index], store.categories[index], -1, bucket,
+                           timestamp)
+        store.update(index, cents, category, description)
+        self._apply_totals(cents, store.categories[index], 1, bucket, timestamp)
+    
+    def _delete(self, index):
+        store = self.transactions
+        bucket = self._live_row(index)
+        self._apply_totals(store.amounts[index], store.categories[index], -1, bucket,
+                           store.timestamps[index])
+        store.delete(index)
+        rows = bucket.writable_rows()
+        del rows[bisect_left(rows, index)]
+    
+    def _month_bucket(self, year, month, create=False):
+        bucket = self._months.get((year, month))
+        if bucket is None and create:
+            bucket = self._months[(year, month)] = MonthBucket()
+        return bucket
+    
+    def _apply_totals(self, cents, code, sign, bucket, timestamp):
+        """Fold one transaction into the running totals (sign=-1 removes it)"""
+        if code == INCOME:
+            self._income += sign * cents
+            bucket.income += sign * cents
+            if self._day_totals is not None:
+                self._day_totals.add(timestamp // 86400, income=sign * cents)
+        elif code == PAID:
+            self._paid += sign * cents
+            bucket.paid += sign * cents
+            if self._day_totals is not None:
+                self._day_totals.add(timestamp // 86400, paid=sign * cents)
+    
+    def verify_totals(self):
+        """Recompute totals from the transaction columns and compare"""
+        store = self.transactions
+        income = store.sum_category(INCOME)
+        paid = store.sum_category(PAID)
+        if income != self._income or paid != self._paid:
+            raise ConsistencyError(
+                f"Running totals income={self._income} paid={self._paid} "
+                f"differ from recompute income={income} paid={paid}")
+        
+        months = {}
+        for timestamp, code, cents in zip(store.timestamps, store.categories,
+                                          store.amounts):
+            if code == DELETED:
+                continue
+            rollup = months.setdefault(month_of(timestamp), [0, 0, 0])
+            if code == INCOME:
+                rollup[0] += cents
+            elif code == PAID:
+                rollup[1] += cents
+            rollup[2] += 1
+        # Every bucket must match, including ones with no live rows left
+        for key in months.keys() | self._months.keys():
+            income, paid, count = months.get(key, (0, 0, 0))
+            bucket = self._months.get(key)
+            if bucket is None:
+                bucket = MonthBucket()
+            if (len(bucket.rows) != count
+                    or bucket.income != income or bucket.paid != paid):
+                raise ConsistencyError(f"Month rollup for {key} is out of date")
+        
+        if self._day_totals is not None:
+            day_totals = self._day_totals
+            covered = day_totals.totals(day_totals.first_day,
+                                        day_totals.first_day + len(day_totals.income))
+            if covered != (self._income, self._paid):
+                raise ConsistencyError("Day range index is out of date")
+    
+    def _roll_calendar(self, now):
+        """Publish MonthRolledOver if the calendar month changed since the last change"""
+        current = (now.year, now.month)
+        if current != self._calendar_month:
+            previous, self._calendar_month = self._calendar_month, current
+            self.events.publish(MonthRolledOver(previous, current))
     
     def add_transaction(self, amount: float, category: str, description: str):
-        """Add a new transaction"""
-        self.transactions.append({
-            'amount': amount,
-            'category': category,
-            'description': description,
-            'date': datetime.now()
-        })
+        """Add a new transaction and return its id"""
+        when = datetime.now()
+        self._roll_calendar(when)
+        cents = to_cents(amount)
+        index = self._append(cents, category, description, to_timestamp(when))
+        if self.ledger is not None:
+            self.ledger.append(LedgerRecord(OP_ADD, amount, category, description, when))
+            self._logged(1)
+        if self.events.wants(TransactionAdded):
+            # The newest row, so it shows first in its month
+            self.events.publish(TransactionAdded(
+                index, *month_of(self.transactions.timestamps[index]), 0,
+                *_split_totals(cents, self.transactions.categories[index])))
+        return index
+    
+    def add_transactions(self, transactions, chunk_size: int = 10000):
+        """
+        Add many (amount, category, description, date) transactions.
+        Columns, totals, month buckets and the ledger are updated once per
+        chunk, so the input can be a generator of any length. A date of None
+        means now. Returns the number of transactions added.
+        """
+        added = 0
+        iterator = iter(transactions)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return added
+            self._append_batch(chunk)
+            added += len(chunk)
+    
+    def _append_batch(self, batch):
+        now = datetime.now()
+        self._roll_calendar(now)
+        batch = [(amount, category, description, when or now)
+                 for amount, category, description, when in batch]
+        cents = [to_cents(amount) for amount, _, _, _ in batch]
+        timestamps = [to_timestamp(when) for _, _, _, when in batch]
+        store = self.transactions
+        first = store.extend(cents, timestamps,
+                             [category for _, category, _, _ in batch],
+                             [description for _, _, description, _ in batch])
+        
+        # Group the new rows by month and fold them into the rollups once
+        months = {}
+        days = {}
+        for offset, timestamp in enumerate(timestamps):
+            day = timestamp // 86400
+            key = days.get(day)
+            if key is None:
+                key = days[day] = month_of(timestamp)
+            months.setdefault(key, []).append(offset)
+        codes = store.categories
+        changes = {}
+        for key, offsets in months.items():
+            bucket = self._month_bucket(*key, create=True)
+            income = paid = 0
+            for offset in offsets:
+                code = codes[first + offset]
+                if code == INCOME:
+                    income += cents[offset]
+                elif code == PAID:
+                    paid += cents[offset]
+            self._income += income
+            self._paid += paid
+            bucket.income += income
+            bucket.paid += paid
+            changes[key] = MonthChange(len(offsets), income, paid)
+            if self._day_totals is not None:
+                for offset in offsets:
+                    code = codes[first + offset]
+                    if code == INCOME:
+                        self._day_totals.add(timestamps[offset] // 86400,
+                                             income=cents[offset])
+                    elif code == PAID:
+                        self._day_totals.add(timestamps[offset] // 86400,
+                                             paid=cents[offset])
+            # New ids are larger than any existing one, so buckets stay sorted
+            bucket.writable_rows().extend(first + offset for offset in offsets)
+        
+        if self.ledger is not None:
+            self.ledger.append_many([
+                LedgerRecord(OP_ADD, amount, category, description, when)
+                for amount, category, description, when in batch
+            ])
+            self._logged(len(batch))
+        self.events.publish(TransactionsAdded(first, len(batch), changes))
+    
+    def edit_transaction(self, index: int, amount: float, category: str,
+                         description: str):
+        """Change the amount, category and description of a transaction"""
+        self._roll_calendar(datetime.now())
+        store = self.transactions
+        bucket = self._live_row(index)
+        before = _split_totals(store.amounts[index], store.categories[index])
+        self._edit(index, to_cents(amount), category, description)
+        if self.ledger is not None:
+            self.ledger.append(LedgerRecord(OP_EDIT, amount, category, description,
+                                            row=index))
+            self._logged(1)
+        if self.events.wants(TransactionEdited):
+            after = _split_totals(store.amounts[index], store.categories[index])
+            self.events.publish(TransactionEdited(
+                index, *month_of(store.timestamps[index]), _display_position(bucket, index),
+                after[0] - before[0], after[1] - before[1]))
+    
+    def delete_transaction(self, index: int):
+        """Delete a transaction"""
+        self._roll_calendar(datetime.now())
+        store = self.transactions
+        bucket = self._live_row(index)
+        position = _display_position(bucket, index)
+        income, paid = _split_totals(store.amounts[index], store.categories[index])
+        self._delete(index)
+        if self.ledger is not None:
+            self.ledger.append(LedgerRecord(OP_DELETE, row=index))
+            self._logged(1)
+        if self.events.wants(TransactionDeleted):
+            self.events.publish(TransactionDeleted(
+                index, *month_of(store.timestamps[index]), position, -income, -paid))
+    
+    def close(self):
+        """Flush pending ledger writes, let compaction finish and release the file"""
+        if self.ledger is not None:
+            if self._compactor is not None:
+                self._compactor.join()
+            # Records that arrived while the last compaction ran may still be
+            # many; nothing changes any more, so snapshot the live state
+            if self._tail_records >= COMPACT_AFTER_RECORDS:
+                try:
+                    self._write_compacted(self, self.ledger.rotate())
+                except (OSError, LedgerError) as e:
+                    print(f"Ledger compaction failed: {e}")
+            self.ledger.close()
     
     @property
     def today_date(self):
@@ -21,46 +483,134 @@ class AccountData:
     
     @property
     def income(self):
-        """Calculate total income"""
-        return sum(t['amount'] for t in self.transactions 
-                  if t['category'] == 'Income')
+        """Total income"""
+        if self.check_consistency:
+            self.verify_totals()
+        return self._income / 100
     
     @property
     def paid(self):
-        """Calculate total paid amount"""
-        return sum(t['amount'] for t in self.transactions 
-                  if t['category'] == 'Paid')
+        """Total paid amount"""
+        if self.check_consistency:
+            self.verify_totals()
+        return self._paid / 100
     
     @property
     def total_saving(self):
-        """Calculate total savings"""
-        return self.income - self.paid
+        """Total savings"""
+        if self.check_consistency:
+            self.verify_totals()
+        return (self._income - self._paid) / 100
     
     @property
     def monthly_range(self):
         """Get current month range (e.g., '10/1 - 10/31')"""
         today = date.today()
-        first_day = date(today.year, today.month, 1)
-        if today.month == 12:
-            next_month = date(today.year + 1, 1, 1)
-        else:
-            next_month = date(today.year, today.month + 1, 1)
-        last_day = (next_month - timedelta(days=1)).day
-        return f"{today.month}/1 - {today.month}/{last_day}"
+        return month_range_label(today.year, today.month)
+    
+    def month_transactions(self, year: int, month: int):
+        """Get transactions for the given month, oldest first"""
+        bucket = self._month_bucket(year, month)
+        if bucket is None:
+            return []
+        store = self.transactions
+        return [store[index] for index in bucket.rows]
+    
+    def select(self, start=None, end=None, category: str = None, limit: int = None):
+        """
+        Get the ids of live transactions dated start <= date < end (either
+        bound may be None) in one category, month by month, oldest month first.
+        Only the month buckets overlapping the range are scanned.
+        With limit, only ids below it count: passing len(transactions) taken on
+        the Tk thread lets a worker select while new rows are being added.
+        """
+        if isinstance(start, date) and not isinstance(start, datetime):
+            start = datetime.combine(start, datetime.min.time())
+        if isinstance(end, date) and not isinstance(end, datetime):
+            end = datetime.combine(end, datetime.min.time())
+        first = (start.year, start.month) if start is not None else None
+        last = (end.year, end.month) if end is not None else None
+        start_ts = to_timestamp(start) if start is not None else None
+        end_ts = to_timestamp(end) if end is not None else None
+        
+        store = self.transactions
+        code = None
+        if category is not None:
+            code = store._category_codes.get(category)
+            if code is None:
+                return array('I')
+        
+        selected = array('I')
+        for key in sorted(self._months):
+            if (first is not None and key < first) or (last is not None and key > last):
+                continue
+            rows = self._months[key].rows
+            # Month rows are in id order. Always slice: the copy is taken in
+            # one C call, so rows appended or removed on the Tk thread while
+            # a worker filters cannot leak past limit or shift rows out
+            if limit is not None:
+                rows = rows[:bisect_left(rows, limit)]
+            # Months wholly inside the range need no timestamp check
+            inside = (first is None or key > first) and (last is None or key < last)
+            if inside:
+                selected.extend(store.select(rows, category=code))
+            else:
+                selected.extend(store.select(rows, start_ts, end_ts, code))
+        return selected
+    
+    def month_rows(self, year: int, month: int):
+        """Get a lazy newest-first view of the given month that tracks new rows"""
+        return MonthRows(self.transactions,
+                         self._month_bucket(year, month, create=True))
+    
+    def month_total(self, year: int, month: int):
+        """Get income minus paid for the given month"""
+        if self.check_consistency:
+            self.verify_totals()
+        bucket = self._month_bucket(year, month)
+        return bucket.total / 100 if bucket is not None else 0.0
+    
+    def _day_index(self):
+        """Build the per-day range-sum index from the columns on first use"""
+        if self._day_totals is None:
+            # Sum per day first, then build the trees in one linear pass
+            income = defaultdict(int)
+            paid = defaultdict(int)
+            store = self.transactions
+            for timestamp, code, cents in zip(store.timestamps, store.categories,
+                                              store.amounts):
+                if code == INCOME:
+                    income[timestamp // 86400] += cents
+                elif code == PAID:
+                    paid[timestamp // 86400] += cents
+            self._day_totals = DayTotals.from_days(income, paid)
+        return self._day_totals
+    
+    def _range_cents(self, start, end):
+        return self._day_index().totals(start.toordinal() - _EPOCH_ORDINAL,
+                                        end.toordinal() - _EPOCH_ORDINAL)
+    
+    def range_totals(self, start: date, end: date):
+        """
+        Get (income, paid) for days start <= day < end in O(log n).
+        Datetimes are truncated to their day.
+        """
+        income, paid = self._range_cents(start, end)
+        return income / 100, paid / 100
+    
+    def range_total(self, start: date, end: date):
+        """Get income minus paid for days start <= day < end"""
+        income, paid = self._range_cents(start, end)
+        return (income - paid) / 100
     
     @property
     def monthly_transactions(self):
         """Get transactions for current month"""
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        return [t for t in self.transactions 
-                if t['date'].month == current_month 
-                and t['date'].year == current_year]
+        today = date.today()
+        return self.month_transactions(today.year, today.month)
     
     @property
     def monthly_total(self):
         """Calculate total for current month"""
-        monthly = self.monthly_transactions
-        income = sum(t['amount'] for t in monthly if t['category'] == 'Income')
-        paid = sum(t['amount'] for t in monthly if t['category'] == 'Paid')
-        return income - paid
\ No newline at end of file
+        today = date.today()
+        return self.month_total(today.year, today.month)
\ No newline at end of file
@@ -1,20 +1,89 @@
 """Account book main screen implementation"""
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
+from datetime import date
 from account_data import AccountData
+from task_executor import TaskExecutor
+from render_scheduler import RenderScheduler, set_text
+from events import (TransactionAdded, TransactionEdited, TransactionDeleted,
+                    TransactionsAdded, MonthRolledOver)
+from src.components.MonthlyStats import MonthlyStats
+from src.components.TransactionHistory import TransactionHistory, format_transaction
+from config import LEDGER_PATH, CHECK_CONSISTENCY
+
+# Parsed chunks waiting to be committed; bounds memory on huge files
+IMPORT_QUEUE_SIZE = 4
+# How often progress bars are redrawn
+PROGRESS_POLL_MS = 30
+
+def open_account_data():
+    """Open the ledger-backed account data; safe to call off the Tk thread"""
+    return AccountData(LEDGER_PATH, check_consistency=CHECK_CONSISTENCY)
+
+def page_in_month(rows, count):
+    """
+    Format the first count rows of a month, which pulls their pages in from
+    the ledger snapshot; safe to call off the Tk thread
+    """
+    for position in range(min(count, len(rows))):
+        format_transaction(rows[position])
+    return rows
 
 class AccountScreen(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, account_data=None, tasks=None):
         tk.Frame.__init__(self, parent)
         self.parent = parent
-        self.account_data = AccountData()
+        if account_data is None:
+            account_data = open_account_data()
+        self.account_data = account_data
+        # Called instead of closing account_data when the screen goes away
+        self.closed_callback = None
+        
+        # Month loads and imports run on the task executor
+        self.owns_tasks = tasks is None
+        self.tasks = TaskExecutor(self) if tasks is None else tasks
+        self.month_key = (id(self), "month")
+        self.import_stop = None
+        
+        # Changes only mark displays dirty; they are redrawn once per idle pass
+        self.render = RenderScheduler(self)
         
         # Configure gradient background
         self.configure(bg="#FFB6C1")
         self.pack(fill="both", expand=True)
         
+        # Make sure queued ledger writes reach disk when the window goes away
+        self.bind("<Destroy>", self.on_destroy)
+        
         self.create_widgets()
+        
+        # Follow changes to the data, whoever makes them
+        self.subscriptions = (
+            (TransactionAdded, self.on_transaction_added),
+            (TransactionEdited, self.on_transaction_edited),
+            (TransactionDeleted, self.on_transaction_deleted),
+            (TransactionsAdded, self.on_transactions_added),
+            (MonthRolledOver, self.on_month_rolled_over),
+        )
+        for event_type, handler in self.subscriptions:
+            self.account_data.events.subscribe(event_type, handler)
+    
+    def on_destroy(self, event):
+        if event.widget is not self:
+            return
+        # The account data may outlive this screen (it stays open for a while)
+        for event_type, handler in self.subscriptions:
+            self.account_data.events.unsubscribe(event_type, handler)
+        self.render.cancel()
+        self.tasks.cancel(self.month_key)
+        if self.import_stop is not None:
+            self.import_stop.set()
+        if self.owns_tasks:
+            self.tasks.shutdown()
+        if self.closed_callback:
+            self.closed_callback()
+        else:
+            self.account_data.close()
     
     def create_widgets(self):
         # Title "account book"
@@ -131,111 +200,82 @@ class AccountScreen(tk.Frame):
             pady=10,
             command=self.show_entry_dialog
         )
-        enter_button.pack(pady=20)
+        enter_button.pack(pady=(20, 5))
         
-        # Monthly summary frame
-        monthly_frame = tk.Frame(self, bg="#E75480")
-        monthly_frame.pack(fill="x", padx=20, pady=10)
+        # Import and export buttons
+        file_frame = tk.Frame(self, bg="#FFB6C1")
+        file_frame.pack(pady=(0, 15))
         
-        # Year label
-        tk.Label(
-            monthly_frame,
-            text="2024",
-            font=("Arial", 14, "bold"),
-            bg="white",
-            fg="#E75480"
-        ).pack(fill="x", pady=5)
-        
-        # Monthly range and amount
-        month_info_frame = tk.Frame(monthly_frame, bg="#E75480")
-        month_info_frame.pack(fill="x", pady=5)
+        tk.Button(
+            file_frame,
+            text="Import file...",
+            font=("Arial", 10),
+            bg="#FFB6C1",
+            fg="#E75480",
+            relief="flat",
+            command=self.choose_import_file
+        ).pack(side="left", padx=5)
         
-        self.monthly_range_label = tk.Label(
-            month_info_frame,
-            text=self.account_data.monthly_range,
-            font=("Arial", 12),
-            bg="#E75480",
-            fg="white"
-        )
-        self.monthly_range_label.pack(side="left", padx=20)
+        tk.Button(
+            file_frame,
+            text="Export...",
+            font=("Arial", 10),
+            bg="#FFB6C1",
+            fg="#E75480",
+            relief="flat",
+            command=self.choose_export_file
+        ).pack(side="left", padx=5)
         
-        self.monthly_amount_label = tk.Label(
-            month_info_frame,
-            text=f"${self.account_data.monthly_total:.2f}",
-            font=("Arial", 12),
-            bg="#E75480",
-            fg="white"
-        )
-        self.monthly_amount_label.pack(side="right", padx=20)
+        # Monthly summary with previous/next month navigation
+        self.monthly_stats = MonthlyStats(self)
+        self.monthly_stats.pack(fill="x", padx=20, pady=10)
+        self.monthly_stats.month_changed_callback = self.show_month
+        self.monthly_stats.render = self.render
         
         # Transaction history
         self.create_history_view()
     
     def create_history_view(self):
         """Create the transaction history view"""
-        # Headers
-        headers_frame = tk.Frame(self, bg="#E75480")
-        headers_frame.pack(fill="x", padx=20, pady=(20, 0))
-        
-        headers = ["DATE", "INCOME/PAID", "DESCRIPTION"]
-        for header in headers:
-            tk.Label(
-                headers_frame,
-                text=header,
-                font=("Arial", 10, "bold"),
-                bg="#E75480",
-                fg="white",
-                width=15
-            ).pack(side="left", padx=5, pady=5)
-        
-        # Scrollable transaction list
-        self.transactions_frame = tk.Frame(self, bg="white")
-        self.transactions_frame.pack(fill="both", expand=True, padx=20)
-        
-        self.update_history()
+        self.history = TransactionHistory(self)
+        self.history.pack(fill="both", expand=True)
+        self.history.render = self.render
+        self.history.row_selected_callback = (
+            lambda position, transaction: self.show_entry_dialog(transaction))
+        
+        today = date.today()
+        self.show_month(today.year, today.month)
+    
+    def show_month(self, year, month):
+        """
+        Show a month. Its totals come from the rollup at once; its rows are
+        paged in on a worker first, and stepping on before they arrive
+        cancels the stale load.
+        """
+        self.history_month = (year, month)
+        self.month_rows = self.account_data.month_rows(year, month)
+        self.monthly_stats.show_month(year, month, self.account_data.month_total(year, month))
+        self.history.clear_history()
+        self.tasks.submit(page_in_month, self.month_rows, len(self.history.row_pool),
+                          on_done=self.show_month_rows, key=self.month_key)
+    
+    def show_month_rows(self, rows):
+        if rows is self.month_rows:
+            self.history.set_rows(rows)
+    
+    def history_shown(self):
+        """Whether the history already lists the month on display"""
+        return self.history.rows is self.month_rows
     
     def update_history(self):
-        """Update the transaction history display"""
-        # Clear existing transactions
-        for widget in self.transactions_frame.winfo_children():
-            widget.destroy()
-        
-        # Add current transactions
-        for transaction in reversed(self.account_data.monthly_transactions):
-            row = tk.Frame(self.transactions_frame, bg="white")
-            row.pack(fill="x", pady=1)
-            
-            # Date
-            tk.Label(
-                row,
-                text=transaction['date'].strftime("%Y-%m-%d"),
-                bg="white",
-                width=15
-            ).pack(side="left", padx=5)
-            
-            # Amount with sign
-            amount_text = f"+${transaction['amount']:.2f}" if transaction['category'] == 'Income' else f"-${transaction['amount']:.2f}"
-            tk.Label(
-                row,
-                text=amount_text,
-                bg="white",
-                width=15,
-                fg="#E75480" if transaction['category'] == 'Income' else "#666666"
-            ).pack(side="left", padx=5)
-            
-            # Description
-            tk.Label(
-                row,
-                text=transaction['description'],
-                bg="white",
-                width=15
-            ).pack(side="left", padx=5)
+        """Rebuild the transaction history for the month on display"""
+        self.show_month(*self.history_month)
     
-    def show_entry_dialog(self):
-        """Show dialog for entering new transaction"""
+    def show_entry_dialog(self, transaction=None):
+        """Show dialog for entering a new transaction or editing an existing one"""
         dialog = tk.Toplevel(self)
-        dialog.title("New Entry")
-        dialog.geometry("300x250")
+        dialog.title("New Entry" if transaction is None else "Edit Entry")
+        dialog.geometry("300x250" if transaction is None else "300x300")
         
         # Amount entry
         tk.Label(dialog, text="Amount:").pack(pady=5)
@@ -255,23 +295,41 @@ class AccountScreen(tk.Frame):
         desc_entry = tk.Entry(dialog)
         desc_entry.pack(pady=5)
         
+        if transaction is not None:
+            amount_entry.insert(0, f"{transaction['amount']:.2f}")
+            category_var.set(transaction['category'])
+            desc_entry.insert(0, transaction['description'])
+        
         def save_entry():
             try:
                 amount = float(amount_entry.get())
                 description = desc_entry.get().strip()
                 if not description:
                     raise ValueError("Description is required")
-                    
-                self.account_data.add_transaction(
-                    amount, 
-                    category_var.get(),
-                    description
-                )
-                self.update_displays()
+                
+                # The displays follow through the change events
+                if transaction is None:
+                    self.account_data.add_transaction(
+                        amount, 
+                        category_var.get(),
+                        description
+                    )
+                else:
+                    self.account_data.edit_transaction(
+                        transaction.id,
+                        amount,
+                        category_var.get(),
+                        description
+                    )
                 dialog.destroy()
             except ValueError as e:
+                from tkinter import messagebox
                 messagebox.showerror("Error", str(e))
         
+        def delete_entry():
+            self.account_data.delete_transaction(transaction.id)
+            dialog.destroy()
+        
         tk.Button(
             dialog,
             text="Save",
@@ -282,12 +340,213 @@ class AccountScreen(tk.Frame):
             padx=20,
             pady=5
         ).pack(pady=20)
+        
+        if transaction is not None:
+            tk.Button(
+                dialog,
+                text="Delete",
+                command=delete_entry,
+                bg="#FFE4E1",
+                fg="#E75480",
+                relief="flat",
+                padx=20,
+                pady=5
+            ).pack()
+    
+    def choose_import_file(self):
+        from tkinter import filedialog
+        
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Import transactions",
+            filetypes=[("Bank exports", "*.csv *.ofx *.qfx *.qif"), ("All files", "*.*")]
+        )
+        if path:
+            self.import_file(path)
+    
+    def import_file(self, path):
+        """
+        Import a bank export without blocking the UI: a worker parses the
+        file into chunks and posts them to the Tk thread, which commits them
+        as they arrive and redraws once at the end. At most IMPORT_QUEUE_SIZE
+        chunks wait to be committed at a time.
+        """
+        import importers
+        from tkinter import ttk
+        
+        stats = importers.ImportStats()
+        slots = threading.Semaphore(IMPORT_QUEUE_SIZE)
+        stop = self.import_stop = threading.Event()
+        
+        def parse():
+            for chunk in importers.chunked(importers.read_file(path, stats)):
+                while not slots.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                self.tasks.post(commit, chunk)
+        
+        dialog = tk.Toplevel(self)
+        dialog.title("Importing")
+        dialog.geometry("300x100")
+        dialog.transient(self)
+        status = tk.Label(dialog, text="Reading file...")
+        status.pack(pady=10)
+        progress = ttk.Progressbar(dialog, length=250, maximum=1.0)
+        progress.pack(pady=5)
+        imported = 0
+        
+        def commit(chunk):
+            nonlocal imported
+            slots.release()
+            if stop.is_set():
+                return
+            imported += self.account_data.add_transactions(chunk)
+            progress["value"] = stats.progress
+            status.config(text=f"{imported:,} transactions imported")
+        
+        def finish(error=None):
+            if stop.is_set():
+                return
+            dialog.destroy()
+            self.show_import_result(path, stats, imported, error)
+        
+        def cancel():
+            # Closing the dialog stops the import; committed chunks stay
+            stop.set()
+            dialog.destroy()
+        
+        dialog.protocol("WM_DELETE_WINDOW", cancel)
+        self.tasks.submit(parse, on_done=lambda _: finish(), on_error=finish)
+    
+    def show_import_result(self, path, stats, imported, error):
+        from tkinter import messagebox
+        
+        if error is not None:
+            print(f"Import of {path} failed: {error}")
+            messagebox.showerror("Import failed", f"{error}\n\n{imported} transactions were imported.")
+            return
+        message = f"Imported {imported} transactions."
+        if stats.skipped:
+            message += f"\nSkipped {stats.skipped} rows:\n" + "\n".join(stats.errors[:5])
+        messagebox.showinfo("Import finished", message)
+    
+    def choose_export_file(self):
+        from tkinter import filedialog
+        
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export transactions",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"),
+                       ("Columnar dump", "*.wbqc")]
+        )
+        if path:
+            self.export_file(path)
+    
+    def export_file(self, path, start=None, end=None, category=None):
+        """
+        Export transactions on the task executor, selecting them there too.
+        Only rows that existed when the export started are considered, so
+        rows added while it runs are left out.
+        """
+        import exporters
+        from tkinter import ttk
+        
+        writer = exporters.WRITERS.get(path[path.rfind("."):].lower())
+        if writer is None:
+            writer = exporters.write_csv
+        account_data = self.account_data
+        limit = len(account_data.transactions)
+        stats = exporters.ExportStats()
+        
+        def run_export():
+            ids = account_data.select(start, end, category, limit=limit)
+            stats.total = len(ids)
+            return writer(account_data.transactions, ids, path, stats)
+        
+        dialog = tk.Toplevel(self)
+        dialog.title("Exporting")
+        dialog.geometry("300x100")
+        dialog.transient(self)
+        tk.Label(dialog, text="Writing transactions...").pack(pady=10)
+        progress = ttk.Progressbar(dialog, length=250, maximum=1.0)
+        progress.pack(pady=5)
+        
+        progress_job = None
+        
+        def show_progress():
+            nonlocal progress_job
+            # Nothing to show until the worker has picked the rows
+            progress["value"] = stats.progress if stats.total else 0.0
+            progress_job = dialog.after(PROGRESS_POLL_MS, show_progress)
+        
+        def close_dialog():
+            # Closing the dialog early only hides the progress; the export carries on
+            nonlocal progress_job
+            if progress_job is not None:
+                dialog.after_cancel(progress_job)
+                progress_job = None
+            dialog.destroy()
+        
+        def finish(result):
+            from tkinter import messagebox
+            
+            if not self.winfo_exists():
+                return
+            if dialog.winfo_exists():
+                close_dialog()
+            if isinstance(result, Exception):
+                print(f"Export to {path} failed: {result}")
+                messagebox.showerror("Export failed", str(result))
+            else:
+                messagebox.showinfo("Export finished", f"Exported {result} transactions.")
+        
+        dialog.protocol("WM_DELETE_WINDOW", close_dialog)
+        self.tasks.submit(run_export, on_done=finish, on_error=finish)
+        show_progress()
+    
+    def on_transaction_added(self, event):
+        if (event.year, event.month) == self.history_month:
+            if self.history_shown():
+                self.history.insert_row(event.position)
+            self.monthly_stats.add_to_total(event.income - event.paid)
+        self.update_displays()
+    
+    def on_transaction_edited(self, event):
+        if (event.year, event.month) == self.history_month:
+            if self.history_shown():
+                self.history.update_row(event.position)
+            self.monthly_stats.add_to_total(event.income - event.paid)
+        self.update_displays()
+    
+    def on_transaction_deleted(self, event):
+        if (event.year, event.month) == self.history_month:
+            if self.history_shown():
+                self.history.remove_row(event.position)
+            self.monthly_stats.add_to_total(event.income - event.paid)
+        self.update_displays()
+    
+    def on_transactions_added(self, event):
+        change = event.months.get(self.history_month)
+        if change is not None:
+            if self.history_shown():
+                self.history.insert_row(0, change.count)
+            self.monthly_stats.add_to_total(change.income - change.paid)
+        self.update_displays()
+    
+    def on_month_rolled_over(self, event):
+        # Follow the calendar only if the month on display was the current one
+        if self.history_month == event.previous:
+            self.show_month(*event.current)
     
     def update_displays(self):
-        """Update all display labels with current data"""
-        self.saving_label.config(text=f"${self.account_data.total_saving:.2f}")
-        self.income_label.config(text=f"${self.account_data.income:.2f}")
-        self.paid_label.config(text=f"${self.account_data.paid:.2f}")
-        self.monthly_range_label.config(text=self.account_data.monthly_range)
-        self.monthly_amount_label.config(text=f"${self.account_data.monthly_total:.2f}")
-        self.update_history()
\ No newline at end of file
+        """Mark the totals dirty; they are redrawn once on the next idle pass"""
+        self.render.mark_dirty(self.render_totals)
+    
+    def render_totals(self):
+        """Redraw the overview labels from the running totals"""
+        set_text(self.saving_label, f"${self.account_data.total_saving:.2f}")
+        set_text(self.income_label, f"${self.account_data.income:.2f}")
+        set_text(self.paid_label, f"${self.account_data.paid:.2f}")
@@ -0,0 +1,157 @@
+"""Vectorised reports over the transaction columns
+
+Analytics copies the amount, timestamp and category columns of a
+TransactionStore into NumPy arrays once, then answers group-by queries
+(per day, week, month or year, per category) with bincount instead of
+Python loops. Results are dense arrays, one slot per period from the first
+to the last period in range, so charts can plot them as they are.
+"""
+from collections import namedtuple
+import numpy as np
+from transaction_store import INCOME, PAID, DELETED, column_parts, to_timestamp
+
+PERIODS = ("day", "week", "month", "year")
+
+# Monday 1969-12-29 starts the week containing EPOCH (a Thursday)
+_WEEK_OFFSET_DAYS = 3
+
+
+def _copy_column(column, dtype):
+    """Copy a store column (possibly split over several buffers) into one array"""
+    parts = [np.frombuffer(part, dtype=dtype) for part in column_parts(column) if len(part)]
+    if not parts:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+
+class PeriodTotals(namedtuple("PeriodTotals", "period starts income paid")):
+    """
+    Income and paid amounts in cents per period.
+    starts holds the first day of each period as datetime64[D].
+    """
+    __slots__ = ()
+
+    @property
+    def net(self):
+        return self.income - self.paid
+
+    @property
+    def savings_rate(self):
+        """Share of income kept, per period (NaN where there was no income)"""
+        income = self.income.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(income > 0, self.net / income, np.nan)
+
+
+def moving_average(values, window: int):
+    """Trailing mean over window periods; the first window-1 slots are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window < 1 or len(values) < window:
+        return result
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    result[window - 1:] = sums[window - 1:] / window
+    return result
+
+
+def _period_keys(timestamps, period):
+    """Integer period numbers since EPOCH for each timestamp"""
+    days = timestamps // 86400
+    if period == "day":
+        return days
+    if period == "week":
+        return (days + _WEEK_OFFSET_DAYS) // 7
+    if period == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    if period == "year":
+        return days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64)
+    raise ValueError(f"Unknown period {period!r}, expected one of {PERIODS}")
+
+
+def _period_starts(keys, period):
+    """First day (datetime64[D]) of each period number"""
+    if period == "day":
+        return keys.astype("datetime64[D]")
+    if period == "week":
+        return (keys * 7 - _WEEK_OFFSET_DAYS).astype("datetime64[D]")
+    if period == "month":
+        return keys.astype("datetime64[M]").astype("datetime64[D]")
+    return keys.astype("datetime64[Y]").astype("datetime64[D]")
+
+
+class Analytics:
+    """
+    Snapshot of a store's columns as NumPy arrays.
+    The snapshot does not follow later changes; call refresh() to take a
+    new one after adding, editing or deleting transactions.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.refresh()
+
+    @classmethod
+    def for_account(cls, account_data):
+        return cls(account_data.transactions)
+
+    def refresh(self):
+        """Copy the current columns (deleted rows are dropped)"""
+        store = self.store
+        # Copies, so the store's arrays stay resizable while we hold them
+        categories = _copy_column(store.categories, np.uint8)
+        live = categories != DELETED
+        self.amounts = _copy_column(store.amounts, np.int64)[live]
+        self.timestamps = _copy_column(store.timestamps, np.int64)[live]
+        self.categories = categories[live]
+        self.category_names = list(store.category_names)
+
+    def _mask(self, start=None, end=None):
+        """Rows dated start <= date < end, or None for all rows"""
+        mask = None
+        if start is not None:
+            mask = self.timestamps >= to_timestamp(start)
+        if end is not None:
+            before = self.timestamps < to_timestamp(end)
+            mask = before if mask is None else mask & before
+        return mask
+
+    def totals(self, period: str = "month", start=None, end=None) -> PeriodTotals:
+        """Income and paid per period, for every period between the first and last row"""
+        amounts, timestamps, categories = self.amounts, self.timestamps, self.categories
+        mask = self._mask(start, end)
+        if mask is not None:
+            amounts, timestamps, categories = amounts[mask], timestamps[mask], categories[mask]
+
+        keys = _period_keys(timestamps, period)
+        if len(keys) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return PeriodTotals(period, np.zeros(0, dtype="datetime64[D]"), empty, empty)
+
+        first = keys.min()
+        slots = keys - first
+        length = int(slots.max()) + 1
+        income = np.bincount(slots, weights=np.where(categories == INCOME, amounts, 0),
+                             minlength=length)
+        paid = np.bincount(slots, weights=np.where(categories == PAID, amounts, 0),
+                           minlength=length)
+        starts = _period_starts(np.arange(first, first + length), period)
+        return PeriodTotals(period, starts, income.astype(np.int64), paid.astype(np.int64))
+
+    def by_category(self, start=None, end=None):
+        """Total cents per category name"""
+        amounts, categories = self.amounts, self.categories
+        mask = self._mask(start, end)
+        if mask is not None:
+            amounts, categories = amounts[mask], categories[mask]
+        sums = np.bincount(categories, weights=amounts,
+                           minlength=len(self.category_names))
+        return {name: int(total) for name, total in zip(self.category_names, sums)}
+
+    def savings_rate(self, start=None, end=None) -> float:
+        """Share of income kept over the whole range (NaN without income)"""
+        sums = self.by_category(start, end)
+        income = sums.get("Income", 0)
+        if not income:
+            return float("nan")
+        return (income - sums.get("Paid", 0)) / income
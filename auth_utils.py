@@ -1,26 +1,75 @@
 """Authentication utility functions"""
+import base64
+import hashlib
+import hmac
 import logging
+import os
+
+# Entry points call setup_logger(); importing this module leaves logging alone
+logger = logging.getLogger(__name__)
 
 def setup_logger():
     """Set up logging configuration"""
     logging.basicConfig(level=logging.INFO)
-    return logging.getLogger(__name__)
+    return logger
+
+# scrypt cost parameters for new hashes (about 150 ms per verify)
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
 
-logger = setup_logger()
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * r * (n + p + 2), dklen=32)
+
+def hash_password(password, salt=None):
+    """
+    Hash a password with a per-user random salt.
+    Returns 'scrypt$n$r$p$salt$hash', which is what credential stores hold.
+    """
+    salt = os.urandom(SALT_BYTES) if salt is None else salt
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+def verify_password(password, encoded):
+    """Check a password against a hash_password() string in constant time"""
+    try:
+        scheme, n, r, p, salt, digest = encoded.split("$")
+        if scheme != "scrypt":
+            raise ValueError(f"unknown scheme {scheme!r}")
+        expected = base64.b64decode(digest)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError as e:
+        logger.warning(f"Unreadable password hash: {e}")
+        return False
+    return hmac.compare_digest(actual, expected)
+
+# Verified against for unknown users, so they take as long as known ones
+_DUMMY_HASH = None
 
 def validate_credentials(credentials, username, password):
     """
-    Validate user credentials
+    Validate user credentials against a {username: password hash} mapping.
+    Slow by design (one scrypt run); call it off the Tk thread.
     Returns tuple (is_valid, error_message)
     """
+    global _DUMMY_HASH
+    
     if not username or not password:
         return False, "Username and password are required"
     
     if username not in credentials:
+        if _DUMMY_HASH is None:
+            _DUMMY_HASH = hash_password("")
+        verify_password(password, _DUMMY_HASH)
         logger.info(f"Login attempt: Username '{username}' not found")
         return False, "Invalid credentials"
         
-    if credentials[username] != password:
+    if not verify_password(password, credentials[username]):
         logger.info(f"Login attempt: Invalid password for user '{username}'")
         return False, "Invalid credentials"
     
@@ -0,0 +1,313 @@
+"""Benchmark AccountData and the history view at 10^3 to 10^7 rows
+
+Times add_transaction, the income/paid/total_saving totals, monthly_transactions
+and monthly_total on in-memory account data of each size, and with --ui also
+AccountScreen.update_displays and TransactionHistory rendering. The UI part
+needs a display; without one it runs under a private Xvfb server if Xvfb is
+installed, and is skipped otherwise. Results are written as JSON; compare
+fails if a metric got slower than the baseline by more than the threshold.
+
+    python benchmarks/benchmark.py run --output baseline.json
+    python benchmarks/benchmark.py run --ui --sizes 1000 100000 --output now.json
+    python benchmarks/benchmark.py compare baseline.json now.json --threshold 0.25
+    python benchmarks/benchmark.py run --compare baseline.json
+
+Every metric is the best per-call time in seconds over --repeat runs.
+Rows are spread evenly over the current month and the 24 before it; the
+10^7 size alone takes about a minute and half a gigabyte.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import timeit
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from account_data import AccountData, shift_month
+
+DEFAULT_SIZES = [10 ** exponent for exponent in range(3, 8)]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+# Differences below this are timer noise, whatever the ratio
+DEFAULT_MIN_DELTA = 100e-9
+HISTORY_MONTHS = 25
+# Calls per run for benchmarks that add rows, so the data barely grows
+ADD_LOOPS = 1000
+UI_ADD_LOOPS = 200
+SCROLL_LOOPS = 200
+
+
+def generate_rows(count):
+    """Yield (amount, category, description, date) rows, oldest first"""
+    today = date.today()
+    per_month, extra = divmod(count, HISTORY_MONTHS)
+    for delta in range(1 - HISTORY_MONTHS, 1):
+        year, month = shift_month(today.year, today.month, delta)
+        start = datetime(year, month, 1)
+        rows = per_month + (extra if delta == 0 else 0)
+        step = 28 * 86400 / max(rows, 1)
+        for i in range(rows):
+            category = "Income" if i % 4 == 0 else "Paid"
+            yield (5 + i % 500 / 4, category, f"Item {i % 1000}",
+                   start + timedelta(seconds=int(i * step)))
+
+
+def best_of(timer, repeat, loops=None):
+    """Return (best, median) seconds per call"""
+    if loops is None:
+        loops, _ = timer.autorange()
+    runs = sorted(total / loops for total in timer.repeat(repeat, loops))
+    return runs[0], runs[len(runs) // 2]
+
+
+class Results:
+    """Metrics keyed "<name>@<rows>", written out as JSON"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, rows, best, median, verbose=True):
+        self.metrics[f"{name}@{rows}"] = {"rows": rows, "seconds": best, "median": median}
+        if verbose:
+            print(f"  {name:<28} {format_seconds(best):>12}   (median {format_seconds(median)})")
+
+    def time(self, name, rows, func, repeat, loops=None):
+        self.add(name, rows, *best_of(timeit.Timer(func), repeat, loops))
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def bench_account_data(results, account_data, rows, repeat):
+    results.time("income", rows, lambda: account_data.income, repeat)
+    results.time("paid", rows, lambda: account_data.paid, repeat)
+    results.time("total_saving", rows, lambda: account_data.total_saving, repeat)
+    results.time("monthly_total", rows, lambda: account_data.monthly_total, repeat)
+    results.time("monthly_transactions", rows,
+                 lambda: account_data.monthly_transactions, repeat)
+    results.time("add_transaction", rows,
+                 lambda: account_data.add_transaction(12.5, "Paid", "Benchmark"),
+                 repeat, ADD_LOOPS)
+
+
+def start_xvfb():
+    """Start a private Xvfb server; return the process, or None if Xvfb is missing"""
+    if shutil.which("Xvfb") is None:
+        return None
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24",
+         "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        display = pipe.readline().strip()
+    if not display:
+        process.kill()
+        return None
+    os.environ["DISPLAY"] = f":{display}"
+    return process
+
+
+class ScreenBench:
+    """An AccountScreen over the benchmark data in a real (or virtual) window"""
+
+    def __init__(self, account_data):
+        import tkinter as tk
+        from account_screen import AccountScreen
+        from task_executor import TaskExecutor
+
+        self.root = tk.Tk()
+        self.root.geometry("400x600")
+        self.tasks = TaskExecutor(self.root)
+        self.screen = AccountScreen(self.root, account_data, tasks=self.tasks)
+        # The data outlives the screen
+        self.screen.closed_callback = lambda: None
+        # Let the month page in on the executor and the pool fill the viewport
+        deadline = time.perf_counter() + 60
+        while not self.screen.history_shown() and time.perf_counter() < deadline:
+            self.root.update()
+            time.sleep(0.005)
+        self.root.update()
+
+    def settle(self):
+        """Run pending renders and let Tk lay out and draw the result"""
+        self.screen.render.flush()
+        self.root.update_idletasks()
+
+    def update_displays(self):
+        self.screen.update_displays()
+        self.settle()
+
+    def set_rows(self):
+        history = self.screen.history
+        history.clear_history()
+        history.set_rows(self.screen.month_rows)
+        self.root.update_idletasks()
+
+    def scroll(self):
+        history = self.screen.history
+        page = max(1, len(history.row_pool) - 1)
+        history.scroll_by(page if history.top == 0 else -history.top)
+        self.root.update_idletasks()
+
+    def add_transaction(self):
+        self.screen.account_data.add_transaction(12.5, "Paid", "Benchmark")
+        self.settle()
+
+    def close(self):
+        self.screen.destroy()
+        self.tasks.shutdown()
+        self.root.destroy()
+
+
+def bench_screen(results, account_data, rows, repeat):
+    bench = ScreenBench(account_data)
+    try:
+        results.time("ui.update_displays", rows, bench.update_displays, repeat)
+        results.time("ui.history_set_rows", rows, bench.set_rows, repeat)
+        results.time("ui.history_scroll", rows, bench.scroll, repeat, SCROLL_LOOPS)
+        results.time("ui.add_transaction", rows, bench.add_transaction, repeat,
+                     UI_ADD_LOOPS)
+    finally:
+        bench.close()
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run(args):
+    xvfb = None
+    ui = args.ui
+    if ui and not os.environ.get("DISPLAY"):
+        xvfb = start_xvfb()
+        if xvfb is None:
+            print("No display and no Xvfb; skipping the UI benchmarks", file=sys.stderr)
+            ui = False
+
+    results = Results()
+    try:
+        for rows in args.sizes:
+            print(f"{rows} rows")
+            account_data = AccountData()
+            started = time.perf_counter()
+            account_data.add_transactions(generate_rows(rows))
+            elapsed = time.perf_counter() - started
+            results.add("add_transactions_per_row", rows, elapsed / rows, elapsed / rows)
+            bench_account_data(results, account_data, rows, args.repeat)
+            if ui:
+                bench_screen(results, account_data, rows, args.repeat)
+            account_data.close()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "ui": ui,
+        },
+        "metrics": results.metrics,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(results.metrics)} metrics to {args.output}")
+    if args.compare:
+        return compare(load_metrics(args.compare), results.metrics,
+                       args.threshold, args.min_delta)
+    return 0
+
+
+def load_metrics(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["metrics"]
+
+
+def compare(baseline, current, threshold, min_delta):
+    """Print how each metric moved; return 1 if any regressed past threshold"""
+    regressions = 0
+    print(f"{'metric':<36} {'baseline':>12} {'current':>12} {'change':>9}")
+    for key in sorted(set(baseline) | set(current),
+                      key=lambda k: (k.split("@")[0], int(k.split("@")[1]))):
+        if key not in current:
+            print(f"{key:<36} {'':>12} {'missing':>12}")
+            continue
+        if key not in baseline:
+            print(f"{key:<36} {'new':>12} {format_seconds(current[key]['seconds']):>12}")
+            continue
+        before, after = baseline[key]["seconds"], current[key]["seconds"]
+        change = after / before - 1 if before else 0.0
+        regressed = change > threshold and after - before > min_delta
+        regressions += regressed
+        print(f"{key:<36} {format_seconds(before):>12} {format_seconds(after):>12} "
+              f"{change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    if regressions:
+        print(f"{regressions} metrics regressed by more than {threshold:.0%}")
+        return 1
+    return 0
+
+
+def add_compare_options(parser):
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default 0.25)")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="ignore slowdowns smaller than this many seconds per call")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                            help="row counts (default 10^3 to 10^7)")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument("--ui", action="store_true",
+                            help="also time the account screen (needs a display or Xvfb)")
+    run_parser.add_argument("--output", help="write the results to this JSON file")
+    run_parser.add_argument("--compare", metavar="BASELINE",
+                            help="compare the results against a baseline JSON file")
+    add_compare_options(run_parser)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    add_compare_options(compare_parser)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    return compare(load_metrics(args.baseline), load_metrics(args.current),
+                   args.threshold, args.min_delta)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,28 @@
 """Configuration settings for the application"""
+import os
 
-# Login credentials (username: password)
+# Login credentials (username: salted scrypt hash, see auth_utils.hash_password)
 CREDENTIALS = {
-    "1": "1",
-    "user": "1"
-}
\ No newline at end of file
+    "1": "scrypt$32768$8$1$H1iQ+PD3t0bIGoPaNWL6iw==$K0Bos3AbsO4FuqIHIPAnuO7GG6QbMMnak0N4+U06AiQ=",
+    "user": "scrypt$32768$8$1$QsQALTy80OmsSLromi72/g==$qlxUQTEncBDpbHRKXQPtt4bE0UVAmuNa7I7aV8jDdOY="
+}
+
+# User directory (sorted on-disk index). CREDENTIALS only seeds it on first
+# run; after that, edits here have no effect: manage users with
+# `python -m webabiq users add|remove|list`
+USERS_PATH = os.path.join("data", "users.wbqu")
+
+# Append-only ledger file holding every transaction
+LEDGER_PATH = os.path.join("data", "ledger.wbq")
+
+# One ledger per user in this directory; a few stay open for fast switching
+LEDGER_DIR = os.path.join("data", "ledgers")
+SHARD_CACHE_SIZE = 4
+# Released shards unused this long are flushed and closed
+SHARD_IDLE_SECONDS = 300
+
+# Compare running totals against a full recompute on every read (debugging aid)
+CHECK_CONSISTENCY = os.environ.get("WEBABIQ_CHECK_CONSISTENCY") == "1"
+
+# Keep the splash up at least this long, even if startup finishes sooner
+SPLASH_MIN_MS = 0
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""Typed change events published by AccountData
+
+Every event carries what a view needs to follow the change without
+recomputing anything: the row id, its (year, month), its display position
+within that month (newest first) and the change to the month's income and
+paid totals in cents.
+"""
+from collections import namedtuple
+
+TransactionAdded = namedtuple("TransactionAdded", "row year month position income paid")
+TransactionEdited = namedtuple("TransactionEdited", "row year month position income paid")
+# position is where the row was shown before it went away
+TransactionDeleted = namedtuple("TransactionDeleted", "row year month position income paid")
+
+# Rows first..first+count-1 added at once; months maps (year, month) to a
+# MonthChange. New rows are the newest of their month, so in each month
+# they take display positions 0..count-1.
+TransactionsAdded = namedtuple("TransactionsAdded", "first count months")
+MonthChange = namedtuple("MonthChange", "count income paid")
+
+# The calendar month moved on between two changes
+MonthRolledOver = namedtuple("MonthRolledOver", "previous current")
+
+
+class EventBus:
+    """Synchronous publish/subscribe keyed by event type"""
+
+    def __init__(self):
+        self._handlers = {}
+
+    def subscribe(self, event_type, handler):
+        """Call handler(event) for every event_type published; returns handler"""
+        self._handlers.setdefault(event_type, []).append(handler)
+        return handler
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def wants(self, event_type) -> bool:
+        """Whether anyone listens, so publishers can skip building the event"""
+        return bool(self._handlers.get(event_type))
+
+    def publish(self, event):
+        # A copy, so handlers may unsubscribe while being called
+        for handler in list(self._handlers.get(type(event), ())):
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Error in {type(event).__name__} handler: {e}")
@@ -0,0 +1,189 @@
+"""Streaming export of transactions (CSV, JSON Lines and a binary columnar dump)
+
+Exports take a list of row ids, usually from AccountData.select(), and read
+the store one row at a time, so memory stays bounded by the id list no
+matter how many years are exported. The columnar dump writes the store's
+typed arrays as raw bytes and load_columns() reads them straight back with
+array.fromfile(), without parsing any rows.
+"""
+import csv
+import json
+import os
+import struct
+from array import array
+from itertools import islice
+from transaction_store import TransactionStore, from_timestamp
+
+# Rows converted per write call
+CHUNK_SIZE = 10000
+# Formatted timestamps remembered before the cache is reset
+DATE_CACHE_SIZE = 4096
+
+COLUMNS = ("id", "date", "category", "description", "amount")
+
+COLUMNAR_MAGIC = b"WBQC"
+COLUMNAR_VERSION = 1
+# File header: magic, format version, row count, number of category names
+_COLUMNAR_HEADER = struct.Struct("<4sHQH")
+_NAME_LENGTH = struct.Struct("<H")
+
+
+class ExportStats:
+    """Rows written so far out of the total, for progress reporting"""
+
+    def __init__(self, total=0):
+        self.rows = 0
+        self.total = total
+
+    @property
+    def progress(self):
+        return self.rows / self.total if self.total else 1.0
+
+
+def iter_rows(store, ids):
+    """Yield (id, ISO date, category, description, amount) for each row id"""
+    amounts = store.amounts
+    timestamps = store.timestamps
+    categories = store.categories
+    descriptions = store.descriptions
+    names = store.category_names
+    dates = {}
+    for i in ids:
+        timestamp = timestamps[i]
+        when = dates.get(timestamp)
+        if when is None:
+            if len(dates) >= DATE_CACHE_SIZE:
+                dates.clear()
+            when = dates[timestamp] = from_timestamp(timestamp).isoformat(sep=" ")
+        yield (i, when, names[categories[i]], store.description(descriptions[i]),
+               f"{amounts[i] / 100:.2f}")
+
+
+def _chunks(store, ids, stats):
+    rows = iter_rows(store, ids)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+        stats.rows += len(chunk)
+
+
+def write_csv(store, ids, path, stats=None):
+    """Write rows to a CSV file with a header line"""
+    stats = stats if stats is not None else ExportStats(len(ids))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for chunk in _chunks(store, ids, stats):
+            writer.writerows(chunk)
+    return stats.rows
+
+
+def write_jsonl(store, ids, path, stats=None):
+    """Write rows as one JSON object per line"""
+    stats = stats if stats is not None else ExportStats(len(ids))
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in _chunks(store, ids, stats):
+            f.write("".join(
+                encode({"id": i, "date": when, "category": category,
+                        "description": description, "amount": float(amount)}) + "\n"
+                for i, when, category, description, amount in chunk))
+    return stats.rows
+
+
+def _write_column(f, column, typecode, ids):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        array(typecode, map(column.__getitem__, ids[start:start + CHUNK_SIZE])).tofile(f)
+
+
+def write_columns(store, ids, path, stats=None):
+    """
+    Write rows as a columnar dump: header, category names, then the amount,
+    timestamp and category columns, description offsets and the text blob.
+    """
+    stats = stats if stats is not None else ExportStats(len(ids))
+    count = len(ids)
+    with open(path, "wb") as f:
+        f.write(_COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, count,
+                                      len(store.category_names)))
+        for name in store.category_names:
+            data = name.encode("utf-8")
+            f.write(_NAME_LENGTH.pack(len(data)) + data)
+
+        _write_column(f, store.amounts, 'q', ids)
+        _write_column(f, store.timestamps, 'q', ids)
+        _write_column(f, store.categories, 'B', ids)
+
+        # Per-row description offsets first, then the text they point into
+        descriptions = store.descriptions
+        offsets = store._text_offsets
+        end = 0
+        array('Q', [0]).tofile(f)
+        for start in range(0, count, CHUNK_SIZE):
+            chunk = array('Q')
+            for i in ids[start:start + CHUNK_SIZE]:
+                code = descriptions[i]
+                end += offsets[code + 1] - offsets[code]
+                chunk.append(end)
+            chunk.tofile(f)
+        for start in range(0, count, CHUNK_SIZE):
+            f.write(b"".join(
+                map(store.description_bytes,
+                    map(descriptions.__getitem__, ids[start:start + CHUNK_SIZE]))))
+            stats.rows = min(count, start + CHUNK_SIZE)
+    return count
+
+
+def load_columns(path) -> TransactionStore:
+    """Load a columnar dump written by write_columns() into a TransactionStore"""
+    with open(path, "rb") as f:
+        header = f.read(_COLUMNAR_HEADER.size)
+        if len(header) < _COLUMNAR_HEADER.size:
+            raise ValueError(f"{path} is not a columnar export")
+        magic, version, count, name_count = _COLUMNAR_HEADER.unpack(header)
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        if version != COLUMNAR_VERSION:
+            raise ValueError(f"Unsupported columnar export version {version}")
+
+        names = []
+        for _ in range(name_count):
+            length, = _NAME_LENGTH.unpack(f.read(_NAME_LENGTH.size))
+            names.append(f.read(length).decode("utf-8"))
+
+        columns = []
+        for typecode, length in (('q', count), ('q', count), ('B', count),
+                                 ('Q', count + 1)):
+            column = array(typecode)
+            column.fromfile(f, length)
+            columns.append(column)
+        amounts, timestamps, categories, text_offsets = columns
+        text = f.read(text_offsets[-1])
+        if len(text) != text_offsets[-1]:
+            raise ValueError(f"{path} is truncated")
+    return TransactionStore.from_columns(amounts, timestamps, categories, names,
+                                         text, text_offsets)
+
+
+WRITERS = {
+    ".csv": write_csv,
+    ".jsonl": write_jsonl,
+    ".wbqc": write_columns,
+}
+
+
+def export(account_data, path, start=None, end=None, category=None, stats=None):
+    """
+    Export transactions dated start <= date < end in one category (all by
+    default) to path, picking the format from its extension.
+    Returns the number of rows written.
+    """
+    writer = WRITERS.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        raise ValueError(f"Unsupported export type: {os.path.basename(path)}")
+    ids = account_data.select(start, end, category)
+    if stats is not None:
+        stats.total = len(ids)
+    return writer(account_data.transactions, ids, path, stats)
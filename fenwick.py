@@ -0,0 +1,123 @@
+"""Fenwick (binary indexed) trees for date-range totals"""
+from array import array
+
+
+class FenwickTree:
+    """Prefix sums over a fixed number of slots with O(log n) point updates"""
+
+    def __init__(self, values=()):
+        # tree[i] (1-based) holds the sum of the lowbit(i) slots ending at i
+        self.tree = array('q', [0])
+        self.tree.extend(values)
+        size = len(self.tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def add(self, slot: int, delta: int):
+        tree = self.tree
+        i = slot + 1
+        size = len(tree)
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> int:
+        """Sum of slots [0, end)"""
+        tree = self.tree
+        i = min(end, len(tree) - 1)
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, start: int, end: int) -> int:
+        """Sum of slots [start, end)"""
+        start = max(start, 0)
+        if end <= start:
+            return 0
+        return self.prefix_sum(end) - self.prefix_sum(start)
+
+
+class DayTotals:
+    """
+    Income and paid cents per day number, answering any day-range total in
+    O(log n). The covered days grow (by doubling) to fit whatever is added.
+    """
+    MIN_DAYS = 1024
+
+    def __init__(self):
+        self.first_day = 0
+        self.income = array('q')
+        self.paid = array('q')
+        self._income_tree = FenwickTree()
+        self._paid_tree = FenwickTree()
+
+    @classmethod
+    def from_days(cls, income, paid):
+        """
+        Build from {day: cents} dicts of income and paid in linear time,
+        rather than one O(log n) add() per row
+        """
+        days = income.keys() | paid.keys()
+        totals = cls()
+        if not days:
+            return totals
+        first, last = min(days), max(days) + 1
+        size = max(cls.MIN_DAYS, 2 * (last - first))
+        totals.first_day = first - (size - (last - first)) // 2
+        totals.income = array('q', bytes(8 * size))
+        totals.paid = array('q', bytes(8 * size))
+        for day, cents in income.items():
+            totals.income[day - totals.first_day] = cents
+        for day, cents in paid.items():
+            totals.paid[day - totals.first_day] = cents
+        totals._income_tree = FenwickTree(totals.income)
+        totals._paid_tree = FenwickTree(totals.paid)
+        return totals
+
+    def add(self, day: int, income: int = 0, paid: int = 0):
+        slot = day - self.first_day
+        if not 0 <= slot < len(self.income):
+            self._grow(day)
+            slot = day - self.first_day
+        if income:
+            self.income[slot] += income
+            self._income_tree.add(slot, income)
+        if paid:
+            self.paid[slot] += paid
+            self._paid_tree.add(slot, paid)
+
+    def totals(self, start_day: int, end_day: int):
+        """(income, paid) cents for days start_day <= day < end_day"""
+        start = start_day - self.first_day
+        end = end_day - self.first_day
+        return (self._income_tree.range_sum(start, end),
+                self._paid_tree.range_sum(start, end))
+
+    def _grow(self, day):
+        """Re-centre and double the covered days so day fits, then rebuild"""
+        size = len(self.income)
+        if size == 0:
+            first, size = day - self.MIN_DAYS // 2, self.MIN_DAYS
+            before = 0
+        else:
+            first = self.first_day
+            last = first + size
+            while not first <= day < last:
+                first -= size // 2
+                last += size - size // 2
+                size = last - first
+            before = self.first_day - first
+        after = size - before - len(self.income)
+        zeros = array('q', bytes(8 * before))
+        self.income = zeros + self.income + array('q', bytes(8 * after))
+        self.paid = zeros + self.paid + array('q', bytes(8 * after))
+        self.first_day = first
+        self._income_tree = FenwickTree(self.income)
+        self._paid_tree = FenwickTree(self.paid)
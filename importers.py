@@ -0,0 +1,285 @@
+"""Streaming readers for bank exports (CSV, OFX and QIF)
+
+Each reader is a generator of (amount, category, description, date) tuples,
+the same shape AccountData.add_transactions() takes, so files of any size
+can be fed through without loading them into memory. Amounts are positive;
+the category ('Income' or 'Paid') carries the sign.
+"""
+import csv
+import io
+import math
+import os
+import re
+from datetime import datetime
+from itertools import islice
+
+CHUNK_SIZE = 10000
+# Refresh ImportStats.bytes_read every this many rows
+PROGRESS_EVERY = 1000
+# Distinct date strings remembered per file before the cache is reset
+DATE_CACHE_SIZE = 4096
+
+# Recognised CSV header names, lower-cased
+DATE_COLUMNS = ("date", "posted", "transaction date", "posting date", "booking date")
+AMOUNT_COLUMNS = ("amount", "value")
+DEBIT_COLUMNS = ("debit", "withdrawal", "paid out")
+CREDIT_COLUMNS = ("credit", "deposit", "paid in")
+DESCRIPTION_COLUMNS = ("description", "memo", "payee", "name", "details", "narrative")
+CATEGORY_COLUMNS = ("category",)
+
+# Larger amounts are typos or garbage (and would not fit the int64 cents column)
+MAX_AMOUNT = 10 ** 12
+
+CATEGORIES = ("Income", "Paid")
+# Lower-cased CSV category values that name one of CATEGORIES
+_CATEGORY_NAMES = {name.lower(): name for name in CATEGORIES}
+
+
+class ImportFileError(ValueError):
+    """Raised when a file cannot be imported at all (bad header, unknown type)"""
+
+
+class ImportStats:
+    """Counts of rows read and skipped by a reader, plus the first few problems"""
+    MAX_ERRORS = 20
+
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.errors = []
+        self.bytes_read = 0
+        self.total_bytes = 0
+
+    @property
+    def progress(self):
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def skip(self, where, reason):
+        self.skipped += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(f"{where}: {reason}")
+
+
+def parse_amount(text):
+    """
+    Parse '1,234.50', '$-12.00' or '(12.00)' into a float. Raises ValueError
+    for non-finite amounts (inf, nan) and ones of MAX_AMOUNT or more.
+    """
+    try:
+        amount = float(text)
+    except ValueError:
+        cleaned = text.strip().replace(",", "").replace("$", "")
+        if cleaned.startswith("(") and cleaned.endswith(")"):
+            cleaned = "-" + cleaned[1:-1]
+        amount = float(cleaned)
+    if not math.isfinite(amount) or abs(amount) >= MAX_AMOUNT:
+        raise ValueError(f"amount out of range: {text.strip()!r}")
+    return amount
+
+
+def signed_row(amount, description, when, category=None):
+    """Build an import row, deriving the category from the sign if not given"""
+    if category is None:
+        category = "Income" if amount >= 0 else "Paid"
+    elif category not in CATEGORIES:
+        raise ValueError(f"unknown category {category!r}")
+    return (abs(amount), category, description, when)
+
+
+_DATE_SEPARATORS = re.compile(r"[-/.']")
+
+
+def parse_date(text, order="ymd"):
+    """
+    Parse a date (optionally followed by a time) without strptime.
+    Handles 2024-01-31, 2024/01/31, 20240131 and, depending on order
+    ('mdy' or 'dmy'), 01/31/2024 or 31/01/2024 including 2-digit years.
+    """
+    text = text.strip()
+    time_part = None
+    if len(text) >= 8 and text[:8].isdigit():
+        # OFX style: YYYYMMDD[HHMMSS[.xxx][TZ]]
+        year, month, day = int(text[0:4]), int(text[4:6]), int(text[6:8])
+        if len(text) >= 14 and text[8:14].isdigit():
+            time_part = (int(text[8:10]), int(text[10:12]), int(text[12:14]))
+    else:
+        if len(text) > 10 and text[10] in " T":
+            clock = text[11:19].split(":")
+            time_part = tuple(int(part) for part in clock) + (0,) * (3 - len(clock))
+            text = text[:10]
+        parts = _DATE_SEPARATORS.split(text.replace(" ", ""))
+        if len(parts) != 3:
+            raise ValueError(f"unrecognised date {text!r}")
+        if len(parts[0]) == 4:
+            year, month, day = int(parts[0]), int(parts[1]), int(parts[2])
+        elif order == "dmy":
+            day, month, year = int(parts[0]), int(parts[1]), int(parts[2])
+        else:
+            month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
+        if year < 100:
+            year += 2000 if year < 70 else 1900
+    if time_part:
+        return datetime(year, month, day, *time_part)
+    return datetime(year, month, day)
+
+
+class DateCache:
+    """Memoise parse_date; exports repeat the same date string many times"""
+    def __init__(self, order="ymd"):
+        self.order = order
+        self.dates = {}
+
+    def __call__(self, text):
+        when = self.dates.get(text)
+        if when is None:
+            if len(self.dates) >= DATE_CACHE_SIZE:
+                self.dates.clear()
+            when = self.dates[text] = parse_date(text, self.order)
+        return when
+
+
+def _open_text(path, stats):
+    """Open path for streaming text reads and record its size in stats"""
+    stats.total_bytes = os.path.getsize(path)
+    raw = open(path, "rb")
+    return raw, io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _find_column(header, names):
+    for i, column in enumerate(header):
+        if column in names:
+            return i
+    return None
+
+
+def read_csv(path, stats=None, date_order="mdy"):
+    """Stream rows from a CSV export with a header line"""
+    stats = stats if stats is not None else ImportStats()
+    raw, text = _open_text(path, stats)
+    with raw, text:
+        reader = csv.reader(text)
+        header = [column.strip().lower() for column in next(reader, [])]
+        date_col = _find_column(header, DATE_COLUMNS)
+        amount_col = _find_column(header, AMOUNT_COLUMNS)
+        debit_col = _find_column(header, DEBIT_COLUMNS)
+        credit_col = _find_column(header, CREDIT_COLUMNS)
+        description_col = _find_column(header, DESCRIPTION_COLUMNS)
+        category_col = _find_column(header, CATEGORY_COLUMNS)
+        if date_col is None or (amount_col is None and debit_col is None
+                                and credit_col is None):
+            raise ImportFileError(
+                "CSV needs a date column and an amount (or debit/credit) column")
+
+        dates = DateCache(date_order)
+        for line_number, row in enumerate(reader, start=2):
+            if line_number % PROGRESS_EVERY == 0:
+                stats.bytes_read = raw.tell()
+            if not row:
+                continue
+            try:
+                when = dates(row[date_col])
+                if amount_col is not None:
+                    amount = parse_amount(row[amount_col])
+                else:
+                    credit = row[credit_col].strip() if credit_col is not None else ""
+                    debit = row[debit_col].strip() if debit_col is not None else ""
+                    amount = (parse_amount(credit) if credit else 0.0) - (
+                        abs(parse_amount(debit)) if debit else 0.0)
+                description = row[description_col].strip() if description_col is not None else ""
+                # Bank categories ("Groceries", ...) are not ours; the sign decides then
+                category = (_CATEGORY_NAMES.get(row[category_col].strip().lower())
+                            if category_col is not None else None)
+                yield signed_row(amount, description or "Imported", when, category)
+                stats.rows += 1
+            except (ValueError, IndexError) as e:
+                stats.skip(f"line {line_number}", e)
+        stats.bytes_read = stats.total_bytes
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def read_ofx(path, stats=None):
+    """Stream <STMTTRN> entries from an OFX file (SGML 1.x or XML 2.x)"""
+    stats = stats if stats is not None else ImportStats()
+    raw, text = _open_text(path, stats)
+    with raw, text:
+        fields = None
+        number = 0
+        for line in text:
+            for closing, tag, value in _OFX_TAG.findall(line):
+                tag = tag.upper()
+                if tag == "STMTTRN":
+                    if not closing:
+                        fields = {}
+                        continue
+                    if fields is not None:
+                        number += 1
+                        try:
+                            when = parse_date(fields["DTPOSTED"])
+                            amount = parse_amount(fields["TRNAMT"])
+                            description = fields.get("NAME") or fields.get("MEMO") or "Imported"
+                            yield signed_row(amount, description, when)
+                            stats.rows += 1
+                        except (KeyError, ValueError) as e:
+                            stats.skip(f"transaction {number}", e)
+                    fields = None
+                elif fields is not None and not closing:
+                    fields[tag] = value.strip()
+            stats.bytes_read = raw.tell()
+        stats.bytes_read = stats.total_bytes
+
+
+def read_qif(path, stats=None, date_order="mdy"):
+    """Stream records from a QIF file (D date, T amount, P payee, M memo, ^ end)"""
+    stats = stats if stats is not None else ImportStats()
+    raw, text = _open_text(path, stats)
+    with raw, text:
+        fields = {}
+        number = 0
+        for line in text:
+            line = line.rstrip("\r\n")
+            if not line or line.startswith("!"):
+                continue
+            code, value = line[0], line[1:].strip()
+            if code != "^":
+                fields.setdefault(code, value)
+                continue
+            number += 1
+            try:
+                when = parse_date(fields["D"], date_order)
+                amount = parse_amount(fields.get("T") or fields["U"])
+                description = fields.get("P") or fields.get("M") or "Imported"
+                yield signed_row(amount, description, when)
+                stats.rows += 1
+            except (KeyError, ValueError) as e:
+                stats.skip(f"record {number}", e)
+            fields = {}
+            stats.bytes_read = raw.tell()
+        stats.bytes_read = stats.total_bytes
+
+
+READERS = {
+    ".csv": read_csv,
+    ".ofx": read_ofx,
+    ".qfx": read_ofx,
+    ".qif": read_qif,
+}
+
+
+def read_file(path, stats=None):
+    """Pick a reader by file extension"""
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ImportFileError(f"Unsupported file type: {os.path.basename(path)}")
+    return reader(path, stats)
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
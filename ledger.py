@@ -0,0 +1,441 @@
+"""Append-only ledger file backing AccountData"""
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+MAGIC = b"WBQL"
+VERSION = 2
+
+# File header: magic, format version, then (from version 2) the ledger id,
+# random bytes shared by all segments of one ledger
+_FILE_HEADER = struct.Struct("<4sH16s")
+_V1_HEADER = struct.Struct("<4sH")
+
+# Offset of the first record in every segment this version writes
+HEADER_SIZE = _FILE_HEADER.size
+
+# Record frame: payload length, crc32 of payload
+_FRAME = struct.Struct("<II")
+# Payload prefixes, chosen by the leading op code:
+#   add:    op, amount, wall-clock microseconds since 1970-01-01, then texts
+#   edit:   op, row id, amount, then texts
+#   delete: op, row id
+_OP = struct.Struct("<B")
+_ADD = struct.Struct("<Bdq")
+_EDIT = struct.Struct("<BQd")
+_DELETE = struct.Struct("<BQ")
+
+OP_ADD = 1
+OP_EDIT = 2
+OP_DELETE = 3
+
+EPOCH = datetime(1970, 1, 1)
+
+# Bytes covered by Ledger.fingerprint()
+FINGERPRINT_BYTES = 256
+
+LedgerRecord = namedtuple("LedgerRecord", "op amount category description date row",
+                          defaults=(None, None, None, None, None))
+
+
+class LedgerError(Exception):
+    """Raised when a ledger file cannot be opened"""
+
+
+def encode_date(when: datetime) -> int:
+    """Convert a naive datetime to wall-clock microseconds since EPOCH"""
+    delta = when - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def decode_date(micros: int) -> datetime:
+    """Convert wall-clock microseconds since EPOCH back to a datetime"""
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _encode_texts(category, description):
+    return category.encode("utf-8") + b"\0" + description.encode("utf-8")
+
+
+def _decode_texts(data):
+    category, _, description = data.partition(b"\0")
+    return category.decode("utf-8"), description.decode("utf-8")
+
+
+def encode_record(record: LedgerRecord):
+    """Frame a single record as bytes ready to be appended"""
+    if record.op == OP_ADD:
+        payload = (_ADD.pack(OP_ADD, record.amount, encode_date(record.date))
+                   + _encode_texts(record.category, record.description))
+    elif record.op == OP_EDIT:
+        payload = (_EDIT.pack(OP_EDIT, record.row, record.amount)
+                   + _encode_texts(record.category, record.description))
+    elif record.op == OP_DELETE:
+        payload = _DELETE.pack(OP_DELETE, record.row)
+    else:
+        raise ValueError(f"Unknown ledger op {record.op}")
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload):
+    """Decode a record payload produced by encode_record"""
+    op, = _OP.unpack_from(payload)
+    if op == OP_ADD:
+        _, amount, micros = _ADD.unpack_from(payload)
+        category, description = _decode_texts(payload[_ADD.size:])
+        return LedgerRecord(op, amount, category, description, decode_date(micros))
+    if op == OP_EDIT:
+        _, row, amount = _EDIT.unpack_from(payload)
+        category, description = _decode_texts(payload[_EDIT.size:])
+        return LedgerRecord(op, amount, category, description, row=row)
+    if op == OP_DELETE:
+        _, row = _DELETE.unpack_from(payload)
+        return LedgerRecord(op, row=row)
+    raise ValueError(f"Unknown ledger op {op}")
+
+
+def fsync_directory(path):
+    """Make a new or renamed file's directory entry durable (where supported)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def lock_path(path: str) -> str:
+    """File a ledger is locked through while a Ledger has it open"""
+    return path + ".lock"
+
+
+def _lock(path):
+    """Take the exclusive lock on a ledger without waiting; returns the lock file"""
+    f = open(lock_path(path), "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        raise LedgerError(f"{path} is already open elsewhere (is Webabiq running?)")
+    return f
+
+
+def _unlock(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+    f.close()
+
+
+def segment_path(path: str, segment: int) -> str:
+    """File of a log segment: the ledger path itself, then path.1, path.2, ..."""
+    return path if segment == 0 else f"{path}.{segment}"
+
+
+def list_segments(path: str):
+    """Numbers of the log segments that exist for a ledger path, in order"""
+    directory = os.path.dirname(path) or "."
+    base = os.path.basename(path)
+    segments = []
+    for name in os.listdir(directory):
+        if name == base:
+            segments.append(0)
+        elif name.startswith(base + ".") and name[len(base) + 1:].isdigit():
+            segments.append(int(name[len(base) + 1:]))
+    return sorted(segments)
+
+
+def _read_header(f, path):
+    """Read a segment header, leaving f at the first record; returns the ledger id"""
+    header = f.read(_V1_HEADER.size)
+    if len(header) < _V1_HEADER.size:
+        raise LedgerError(f"Ledger header truncated: {path}")
+    magic, version = _V1_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise LedgerError(f"Not a ledger file: {path}")
+    if version == 1:
+        # Written before ledgers had an id
+        return None
+    if version != VERSION:
+        raise LedgerError(f"Unsupported ledger version {version}")
+    ledger_id = f.read(_FILE_HEADER.size - _V1_HEADER.size)
+    if len(ledger_id) < _FILE_HEADER.size - _V1_HEADER.size:
+        raise LedgerError(f"Ledger header truncated: {path}")
+    return ledger_id
+
+
+def _read_segment(path, start=None, truncate=False):
+    """
+    Yield the intact records of one segment file from byte offset start.
+    A torn or corrupt tail is truncated away if truncate is set (only ever
+    the last segment) and is an error otherwise.
+    """
+    with open(path, "rb", buffering=1 << 20) as f:
+        _read_header(f, path)
+        if start is not None and start > f.tell():
+            f.seek(start)
+        good_end = f.tell()
+        while True:
+            frame = f.read(_FRAME.size)
+            if len(frame) < _FRAME.size:
+                break
+            length, crc = _FRAME.unpack(frame)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            try:
+                record = decode_record(payload)
+            except (struct.error, ValueError) as e:
+                # The frame is intact, so this is not a torn write; never truncate it
+                raise LedgerError(f"Unreadable record at offset {good_end} of {path}: {e}")
+            good_end += _FRAME.size + length
+            yield record
+
+    if os.path.getsize(path) > good_end:
+        if not truncate:
+            raise LedgerError(f"Corrupt record at offset {good_end} of {path}")
+        with open(path, "r+b") as f:
+            f.truncate(good_end)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def read_segments(path, first_segment, start, end_segment):
+    """
+    Yield the records of the closed segments first_segment..end_segment - 1,
+    beginning at byte offset start of the first one. Used by compaction,
+    which never touches the segment being appended to.
+    """
+    for segment in range(first_segment, end_segment):
+        yield from _read_segment(segment_path(path, segment),
+                                 start if segment == first_segment else None)
+
+
+class Ledger:
+    """
+    Append-only transaction log with group commit.
+
+    Appends are queued and written by a background thread, which waits
+    commit_interval seconds so that a burst of entries shares one fsync.
+    The log is a series of segment files; rotate() starts a new one so
+    that older segments can be folded into a snapshot and deleted.
+
+    Only one Ledger may have a path open at a time, in any process: row ids
+    in edit and delete records are only meaningful to the writer that
+    numbered the rows. Opening a ledger that is in use raises LedgerError.
+    """
+
+    def __init__(self, path: str, commit_interval: float = 0.05):
+        self.path = path
+        self.commit_interval = commit_interval
+        self._file = None
+        self._recovered = False
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._appended = 0
+        self._durable = 0
+        self._closing = False
+        self._flusher = None
+        self._error = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock_file = _lock(path)
+        segments = list_segments(path)
+        self.segment = segments[-1] if segments else 0
+        # New segments carry on the id of the newest one; a new ledger, or one
+        # written before ledgers had ids, gets a fresh id
+        self.ledger_id = self._stored_id() if segments else None
+        if self.ledger_id is None:
+            self.ledger_id = os.urandom(_FILE_HEADER.size - _V1_HEADER.size)
+        if not segments:
+            self._create(path)
+
+    @property
+    def active_path(self):
+        """The segment file new records are appended to"""
+        return segment_path(self.path, self.segment)
+
+    def _stored_id(self):
+        """The ledger id in the active segment's header, None if it has none"""
+        try:
+            with open(self.active_path, "rb") as f:
+                return _read_header(f, self.active_path)
+        except (OSError, LedgerError):
+            # replay() reports a bad header
+            return None
+
+    def _create(self, path):
+        """Write a fresh file header and make it durable"""
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(MAGIC, VERSION, self.ledger_id))
+            f.flush()
+            os.fsync(f.fileno())
+        fsync_directory(path)
+
+    def replay(self, start: int = None, segment: int = None):
+        """
+        Yield every intact record in log order, beginning at byte offset
+        start of segment (e.g. a snapshot's position) if given.
+        A torn or corrupt tail (e.g. from a crash mid-append) is truncated away.
+        """
+        segments = list_segments(self.path)
+        if segment is None:
+            if segments and segments[0] != 0:
+                raise LedgerError(f"Segments before {segments[0]} of {self.path} were "
+                                  f"compacted away; their snapshot is needed to open it")
+            segment = 0
+        for number in segments:
+            if number < segment:
+                continue
+            yield from _read_segment(segment_path(self.path, number),
+                                     start if number == segment else None,
+                                     truncate=number == segments[-1])
+        self._recovered = True
+
+    def fingerprint(self, offset: int, segment: int = 0):
+        """
+        Checksum of the bytes of a segment just before offset, so a snapshot
+        can tell whether the log it was taken from is still the same file.
+        These include the segment header and so the ledger id: a snapshot
+        taken at the start of a segment does not match another ledger.
+        Returns None if the segment is missing or shorter than offset.
+        """
+        path = segment_path(self.path, segment)
+        if offset < _FILE_HEADER.size or not os.path.exists(path) \
+                or os.path.getsize(path) < offset:
+            return None
+        start = max(0, offset - FINGERPRINT_BYTES)
+        with open(path, "rb") as f:
+            f.seek(start)
+            return zlib.crc32(f.read(offset - start))
+
+    def append(self, record: LedgerRecord):
+        """Queue a record for the next group commit; returns its sequence number"""
+        return self.append_many((record,))
+
+    def append_many(self, records):
+        """Queue several records as one write; returns the last sequence number"""
+        if not self._recovered:
+            for _ in self.replay():
+                pass
+        data = b"".join(map(encode_record, records))
+        count = len(records)
+        with self._cond:
+            if self._closing:
+                raise LedgerError("Ledger is closed")
+            if self._error is not None:
+                raise LedgerError(f"Ledger commit failed: {self._error}")
+            self._pending.append(data)
+            self._appended += count
+            if self._flusher is None:
+                self._file = open(self.active_path, "ab")
+                self._flusher = threading.Thread(
+                    target=self._run, name="ledger-commit", daemon=True)
+                self._flusher.start()
+            self._cond.notify_all()
+            return self._appended
+
+    def rotate(self) -> int:
+        """
+        Make everything appended so far durable, then send new records to a
+        fresh segment. Returns the new segment number; all earlier segments
+        are complete and will not change again.
+        """
+        if not self._recovered:
+            for _ in self.replay():
+                pass
+        with self._cond:
+            if self._closing:
+                raise LedgerError("Ledger is closed")
+            while self._durable < self._appended and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise LedgerError(f"Ledger commit failed: {self._error}")
+            # The writer is idle until the next append, which needs this lock
+            segment = self.segment + 1
+            self._create(segment_path(self.path, segment))
+            if self._file is not None:
+                self._file.close()
+                self._file = open(segment_path(self.path, segment), "ab")
+            self.segment = segment
+            return segment
+
+    def remove_segments(self, before: int):
+        """Delete the segments numbered below before (they are in a snapshot)"""
+        for number in list_segments(self.path):
+            if number < before:
+                try:
+                    os.remove(segment_path(self.path, number))
+                except OSError as e:
+                    print(f"Could not remove ledger segment {number}: {e}")
+
+    def sync(self, seq=None):
+        """Block until record seq (default: everything appended so far) is durable"""
+        with self._cond:
+            target = self._appended if seq is None else seq
+            while self._durable < target and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise LedgerError(f"Ledger commit failed: {self._error}")
+
+    def close(self):
+        """Commit anything pending and stop the background writer"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._file.close()
+        _unlock(self._lock_file)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                closing = self._closing
+
+            # Give the rest of a burst a chance to join this commit
+            if not closing and self.commit_interval > 0:
+                time.sleep(self.commit_interval)
+
+            with self._cond:
+                batch, self._pending = self._pending, []
+                seq = self._appended
+            try:
+                self._file.write(b"".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = seq
+                self._cond.notify_all()
@@ -0,0 +1,134 @@
+"""Per-user ledger shards with an LRU of open AccountData instances"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from account_data import AccountData
+
+
+def shard_path(directory, username):
+    """Ledger file for a user; names are hashed so any username is a safe filename"""
+    digest = hashlib.sha256(username.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(directory, f"{digest}.wbq")
+
+
+class LedgerShards:
+    """
+    Open each user's ledger on first use and keep recently used ones open.
+
+    acquire() hands out a user's AccountData and release() gives it back.
+    Released shards stay open for fast user switching until either more
+    than capacity are open or they sit unused for idle_seconds; then they
+    are flushed and closed. Shards in use are never closed, so memory is
+    bounded by the active users plus capacity.
+
+    Closing a shard can take a while (it waits for compaction and may write
+    a snapshot), so Tk code should call release() and close_idle() from the
+    task executor rather than the Tk thread.
+    """
+    def __init__(self, directory, capacity: int = 4, idle_seconds: float = 300,
+                 check_consistency: bool = False):
+        self.directory = directory
+        self.capacity = capacity
+        self.idle_seconds = idle_seconds
+        self.check_consistency = check_consistency
+        # username -> [AccountData, users holding it, last released at]
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+        # username -> Event set once their ledger has finished opening or
+        # closing; until then the ledger file is locked and must not be reopened
+        self._busy = {}
+
+    def acquire(self, username) -> AccountData:
+        """Get a user's AccountData, replaying their ledger if it is not open"""
+        while True:
+            with self._lock:
+                entry = self._open.get(username)
+                if entry is not None:
+                    entry[1] += 1
+                    self._open.move_to_end(username)
+                    return entry[0]
+                busy = self._busy.get(username)
+                if busy is None:
+                    opening = self._busy[username] = threading.Event()
+                    break
+            # Another thread is opening or closing this ledger; wait for it
+            busy.wait()
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            account_data = AccountData(shard_path(self.directory, username),
+                                       check_consistency=self.check_consistency)
+        except BaseException:
+            with self._lock:
+                del self._busy[username]
+            opening.set()
+            raise
+        # Waiters must find the shard open the moment they stop waiting
+        with self._lock:
+            self._open[username] = [account_data, 1, None]
+            del self._busy[username]
+            evicted = self._evict()
+        opening.set()
+        self._close_all(evicted)
+        return account_data
+
+    def release(self, username):
+        """Give back a shard from acquire(); it stays open until evicted or idle"""
+        with self._lock:
+            entry = self._open.get(username)
+            if entry is None or entry[1] == 0:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:
+                entry[2] = time.monotonic()
+            evicted = self._evict()
+        self._close_all(evicted)
+
+    def close_idle(self):
+        """Close released shards unused for idle_seconds; returns how many"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [username for username, (_, users, released) in self._open.items()
+                    if users == 0 and now - released >= self.idle_seconds]
+            evicted = [self._take(username) for username in idle]
+        self._close_all(evicted)
+        return len(evicted)
+
+    def close(self):
+        """Flush and close every open shard, including ones still being opened"""
+        while True:
+            with self._lock:
+                evicted = [self._take(username) for username in list(self._open)]
+                busy = list(self._busy.values())
+            if not busy:
+                return
+            self._close_all(evicted)
+            for event in busy:
+                event.wait()
+
+    def _take(self, username):
+        """Remove a shard from the open set for closing (lock held)"""
+        closing = self._busy[username] = threading.Event()
+        return username, self._open.pop(username)[0], closing
+
+    def _evict(self):
+        """Drop least recently used released shards beyond capacity (lock held)"""
+        excess = len(self._open) - self.capacity
+        idle = [username for username, (_, users, _) in self._open.items() if users == 0]
+        return [self._take(username) for username in idle[:max(excess, 0)]]
+
+    def _close_all(self, shards):
+        for username, account_data, closing in shards:
+            try:
+                account_data.close()
+            except Exception as e:
+                print(f"Error closing ledger shard: {e}")
+            finally:
+                with self._lock:
+                    del self._busy[username]
+                closing.set()
+
+    def __len__(self):
+        return len(self._open)
@@ -0,0 +1,187 @@
+"""Memory-mapped snapshots of AccountData for instant cold opens
+
+A snapshot is a fixed-width binary image of the transaction columns. Its
+header holds the running totals and the ledger position (segment and byte
+offset) it covers, and a month table follows. Opening a book therefore
+reads two small blocks and maps the rest: column pages are only read when
+rows are accessed, and only ledger records written after the snapshot
+have to be replayed.
+
+Snapshots are named after the segment they start at (ledger.wbq.snap.3),
+so a new one never has to replace a file that is still mapped.
+
+Layout (native little-endian, every section 8-byte aligned):
+    header          see _HEADER
+    category names  count x (length, utf-8 bytes)
+    month table     count x (year, month, income, paid, first row slot, row count)
+    month rows      uint32 row ids of every month, in month table order
+    amounts         int64 cents per row
+    timestamps      int64 seconds per row
+    categories      uint8 code per row
+    descriptions    uint32 description code per row
+    text offsets    uint64, one more than there are description codes
+    text            utf-8 description blob
+"""
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from ledger import fsync_directory
+from transaction_store import TransactionStore, column_parts
+
+MAGIC = b"WBQS"
+VERSION = 2
+
+# A ledger's snapshots live next to it, e.g. ledger.wbq.snap.3
+SNAPSHOT_SUFFIX = ".snap"
+
+# magic, version, category count, ledger fingerprint, ledger segment,
+# ledger offset, rows, income, paid, description codes, text bytes, months
+_HEADER = struct.Struct("<4sHHIQQQqqQQQ")
+_NAME_LENGTH = struct.Struct("<H")
+_MONTH = struct.Struct("<iIqqQQ")
+
+ALIGN = 8
+
+Snapshot = namedtuple("Snapshot",
+                      "ledger_segment ledger_offset fingerprint income paid months store")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file cannot be used"""
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _pad(f):
+    f.write(bytes(_aligned(f.tell()) - f.tell()))
+
+
+def _write_column(f, column):
+    for part in column_parts(column):
+        f.write(part)
+    _pad(f)
+
+
+def snapshot_path(ledger_path, segment):
+    """Snapshot file covering a ledger up to the start of segment"""
+    return f"{ledger_path}{SNAPSHOT_SUFFIX}.{segment}"
+
+
+def list_snapshots(ledger_path):
+    """(segment, path) of every snapshot of a ledger, newest first"""
+    directory = os.path.dirname(ledger_path) or "."
+    prefix = os.path.basename(ledger_path) + SNAPSHOT_SUFFIX + "."
+    found = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            found.append((int(name[len(prefix):]), os.path.join(directory, name)))
+    return sorted(found, reverse=True)
+
+
+def write_snapshot(path, store, months, income, paid, ledger_segment, ledger_offset,
+                   fingerprint):
+    """
+    Write store, month rollups ({(year, month): MonthBucket}) and totals
+    to path, which only appears once the new snapshot is durable.
+    """
+    (text_base, text_tail), text_offsets = store.text_table()
+    keys = sorted(months)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(store.category_names), fingerprint,
+                             ledger_segment, ledger_offset, len(store), income, paid,
+                             len(text_offsets) - 1, len(text_base) + len(text_tail),
+                             len(keys)))
+        _pad(f)
+        for name in store.category_names:
+            data = name.encode("utf-8")
+            f.write(_NAME_LENGTH.pack(len(data)) + data)
+        _pad(f)
+
+        slot = 0
+        for key in keys:
+            bucket = months[key]
+            f.write(_MONTH.pack(key[0], key[1], bucket.income, bucket.paid,
+                                slot, len(bucket.rows)))
+            slot += len(bucket.rows)
+        for key in keys:
+            f.write(months[key].rows)
+        _pad(f)
+
+        for column in (store.amounts, store.timestamps, store.categories,
+                       store.descriptions, text_offsets):
+            _write_column(f, column)
+        f.write(text_base)
+        f.write(text_tail)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    fsync_directory(path)
+
+
+def open_snapshot(path):
+    """
+    Map a snapshot written by write_snapshot(); returns None if there is none.
+    The mapping is copy-on-write, so edits to loaded rows stay in memory.
+    """
+    if not os.path.exists(path):
+        return None
+    if sys.byteorder != "little":
+        raise SnapshotError("Snapshots are little-endian only")
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise SnapshotError(f"{path} is truncated")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    (magic, version, category_count, fingerprint, ledger_segment, ledger_offset, rows,
+     income, paid, text_codes, text_bytes, month_count) = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} is not a snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+
+    view = memoryview(data)
+    offset = _aligned(_HEADER.size)
+    try:
+        names = []
+        for _ in range(category_count):
+            length, = _NAME_LENGTH.unpack_from(data, offset)
+            offset += _NAME_LENGTH.size
+            names.append(bytes(view[offset:offset + length]).decode("utf-8"))
+            offset += length
+        offset = _aligned(offset)
+
+        table = [_MONTH.unpack_from(data, offset + i * _MONTH.size)
+                 for i in range(month_count)]
+        offset += month_count * _MONTH.size
+        month_rows = sum(entry[5] for entry in table)
+
+        def section(typecode, size, count):
+            nonlocal offset
+            end = offset + size * count
+            if end > len(data):
+                raise SnapshotError(f"{path} is truncated")
+            part = view[offset:end].cast(typecode)
+            offset = _aligned(end)
+            return part
+
+        all_month_rows = section('I', 4, month_rows)
+        amounts = section('q', 8, rows)
+        timestamps = section('q', 8, rows)
+        categories = section('B', 1, rows)
+        descriptions = section('I', 4, rows)
+        text_offsets = section('Q', 8, text_codes + 1)
+        text = section('B', 1, text_bytes)
+    except struct.error as e:
+        raise SnapshotError(f"{path} is truncated: {e}")
+
+    months = {(year, month): (month_income, month_paid,
+                              all_month_rows[first:first + count])
+              for year, month, month_income, month_paid, first, count in table}
+    store = TransactionStore.from_segments(amounts, timestamps, categories, descriptions,
+                                           names, text, text_offsets)
+    return Snapshot(ledger_segment, ledger_offset, fingerprint, income, paid, months, store)
@@ -1,17 +1,37 @@
 """Login screen implementation"""
 import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
 import os
 from auth_utils import validate_credentials
+from task_executor import TaskExecutor
+
+# Busy indicator frames on the LOG IN button
+BUSY_FRAMES = ("LOGGING IN", "LOGGING IN.", "LOGGING IN..", "LOGGING IN...")
+BUSY_FRAME_MS = 250
+
+def load_bottom_logo(logo_path="assets/loginlogo.png"):
+    """Load and resize the bottom logo; safe to call off the Tk thread"""
+    from PIL import Image
+    
+    image = Image.open(logo_path)
+    return image.resize((50, 50), Image.Resampling.LANCZOS)
 
 class LoginScreen(tk.Frame):
-    def __init__(self, parent, credentials):
+    def __init__(self, parent, credentials, logo_image=None, tasks=None):
         tk.Frame.__init__(self, parent)
         self.parent = parent
         self.credentials = credentials
+        self.logo_image = logo_image
         self.login_success_callback = None
         
+        # Credential checks run on the task executor; only the latest attempt counts
+        self.owns_tasks = tasks is None
+        self.tasks = TaskExecutor(self) if tasks is None else tasks
+        self.login_task = None
+        self.busy_frame = 0
+        self.busy_job = None
+        # Set while the owner opens the account after a successful login
+        self.opening_account = False
+        
         # Configure pink background
         self.configure(bg="#FFB6C1")
         self.pack(fill="both", expand=True)
@@ -94,7 +114,7 @@ class LoginScreen(tk.Frame):
         remember_check.pack(pady=(0, 20))
         
         # Login button
-        login_button = tk.Button(
+        self.login_button = login_button = tk.Button(
             self.login_container,
             text="LOG IN",
             command=self.login,
@@ -127,11 +147,12 @@ class LoginScreen(tk.Frame):
     
     def add_bottom_logo(self):
         logo_path = os.path.join("assets/loginlogo.png")
-        if os.path.exists(logo_path):
+        if self.logo_image is not None or os.path.exists(logo_path):
             try:
-                # Load and resize the logo
-                image = Image.open(logo_path)
-                image = image.resize((50, 50), Image.Resampling.LANCZOS)
+                # Use the preloaded logo if startup prepared one
+                from PIL import ImageTk
+                
+                image = self.logo_image or load_bottom_logo(logo_path)
                 photo = ImageTk.PhotoImage(image)
                 
                 # Create a label for the logo
@@ -146,16 +167,70 @@ class LoginScreen(tk.Frame):
                 print(f"Error loading bottom logo: {e}")
     
     def login(self):
+        """Check the credentials on a worker thread; the result arrives via after()"""
+        if self.opening_account:
+            return
         username = self.username_entry.get().strip()
         password = self.password_entry.get().strip()
         
-        is_valid, error_message = validate_credentials(self.credentials, username, password)
+        # A newer attempt cancels the one still being checked
+        self.login_task = self.tasks.submit(
+            validate_credentials, self.credentials, username, password,
+            on_done=lambda result: self.finish_login(username, *result),
+            on_error=lambda e: self.finish_login(username, False, f"Login failed: {e}"),
+            key=(id(self), "login")
+        )
+        if self.busy_job is None:
+            self.login_button.config(state="disabled", cursor="watch")
+            self.animate_busy()
+    
+    def animate_busy(self):
+        self.busy_job = None
+        if self.login_task is None and not self.opening_account:
+            return
+        self.login_button.config(text=BUSY_FRAMES[self.busy_frame % len(BUSY_FRAMES)])
+        self.busy_frame += 1
+        self.busy_job = self.after(BUSY_FRAME_MS, self.animate_busy)
+    
+    def finish_login(self, username, is_valid, error_message):
+        self.login_task = None
+        if is_valid and self.login_success_callback:
+            # Stay busy, and ignore further attempts, until the owner has
+            # opened the account; it calls login_failed() if that fails
+            self.opening_account = True
+            self.login_success_callback(username)
+            return
         
-        if is_valid:
-            if self.login_success_callback:
-                self.login_success_callback()
-        else:
+        self.stop_busy()
+        if not is_valid:
+            from tkinter import messagebox
             messagebox.showerror("Error", error_message)
     
+    def login_failed(self, error_message):
+        """Opening the account after a successful login failed; allow another try"""
+        self.opening_account = False
+        self.stop_busy()
+        from tkinter import messagebox
+        messagebox.showerror("Error", error_message)
+    
+    def stop_busy(self):
+        if self.busy_job is not None:
+            self.after_cancel(self.busy_job)
+            self.busy_job = None
+        self.busy_frame = 0
+        self.login_button.config(state="normal", cursor="hand2", text="LOG IN")
+    
+    def destroy(self):
+        if self.login_task is not None:
+            self.login_task.cancel()
+            self.login_task = None
+        if self.busy_job is not None:
+            self.after_cancel(self.busy_job)
+            self.busy_job = None
+        if self.owns_tasks:
+            self.tasks.shutdown()
+        tk.Frame.destroy(self)
+    
     def forgot_password(self, event):
+        from tkinter import messagebox
         messagebox.showinfo("Forgot Password", "Coming soon")
\ No newline at end of file
@@ -1,12 +1,24 @@
+import timing  # first, so the import phase covers everything below
+import os
 import tkinter as tk
 from splash_screen import SplashScreen
-from login_screen import LoginScreen
+from login_screen import LoginScreen, load_bottom_logo
 from account_screen import AccountScreen
-from config import CREDENTIALS
+from ledger_shards import LedgerShards
+from startup import StartupPipeline
+from task_executor import TaskExecutor
+from user_directory import open_user_directory
+from auth_utils import setup_logger
+from config import (CREDENTIALS, SPLASH_MIN_MS, LEDGER_DIR, SHARD_CACHE_SIZE,
+                    SHARD_IDLE_SECONDS, CHECK_CONSISTENCY)
 
 def main():
+    timing.configure()
+    timing.mark("imports")
+    setup_logger()
     root = tk.Tk()
     root.title("Webabiq")
+    timing.mark("tk_init")
     
     window_width = 400
     window_height = 600
@@ -17,19 +29,86 @@ def main():
     root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
     
     splash = SplashScreen(root)
+    timing.mark_on_event(splash, "<Expose>", "splash_first_paint")
     
-    root.after(3000, lambda: show_login(root, splash))
+    # One worker pool for the whole app; results come back on the Tk thread
+    tasks = TaskExecutor(root)
+    
+    # Each user's ledger is opened after they log in
+    shards = LedgerShards(LEDGER_DIR, SHARD_CACHE_SIZE, SHARD_IDLE_SECONDS,
+                          check_consistency=CHECK_CONSISTENCY)
+    close_idle_shards(root, shards, tasks)
+    
+    # Prepare everything behind the splash and swap as soon as it is ready
+    startup = StartupPipeline(root, min_display_ms=SPLASH_MIN_MS, tasks=tasks)
+    startup.add_background("login_logo", preload_login_logo)
+    startup.add_background("users", open_user_directory)
+    startup.add_main("login_screen", lambda: build_login(root, startup, shards, tasks),
+                     requires=("login_logo", "users"))
+    startup.start(lambda: show_login(root, splash, startup))
     
     root.mainloop()
+    tasks.shutdown()
+    shards.close()
+
+def close_idle_shards(root, shards, tasks):
+    # Closing may wait for compaction and write a snapshot; keep it off the Tk thread
+    tasks.submit(shards.close_idle)
+    root.after(SHARD_IDLE_SECONDS * 1000 // 2,
+               lambda: close_idle_shards(root, shards, tasks))
+
+def release_shard(shards, tasks, username):
+    """Give a user's shard back off the Tk thread, since that may close it"""
+    try:
+        tasks.submit(shards.release, username)
+    except (RuntimeError, tk.TclError):
+        # Shutting down; shards.close() closes every shard anyway
+        pass
 
-def show_login(root, splash):
+def preload_login_logo():
+    if os.path.exists("assets/loginlogo.png"):
+        return load_bottom_logo()
+    return None
+
+def build_login(root, startup, shards, tasks):
+    """Build the login screen hidden, so showing it later is just a pack()"""
+    logo = startup.results.get("login_logo")  # None if preloading failed
+    users = startup.results.get("users", CREDENTIALS)  # config if the directory failed
+    login_screen = LoginScreen(root, users, logo_image=logo, tasks=tasks)
+    login_screen.pack_forget()
+    login_screen.login_success_callback = (
+        lambda username: show_account(root, login_screen, shards, tasks, username))
+    return login_screen
+
+def show_login(root, splash, startup):
     splash.destroy()
-    login_screen = LoginScreen(root, CREDENTIALS)
-    login_screen.login_success_callback = lambda: show_account(root, login_screen)
+    login_screen = startup.result("login_screen")
+    login_screen.pack(fill="both", expand=True)
+    login_screen.username_entry.focus()
+    timing.mark_when_idle(root, "login_ready", then=lambda: finish_timing(root))
+
+def finish_timing(root):
+    if timing.timer.exit_when_interactive:
+        timing.timer.write()
+        root.destroy()
+
+def show_account(root, login_screen, shards, tasks, username):
+    """Open the user's ledger shard off the Tk thread, then swap screens"""
+    loader = StartupPipeline(root, tasks=tasks)
+    loader.add_background("account_data", lambda: shards.acquire(username))
+    loader.start(lambda: open_account_screen(root, login_screen, shards, tasks, username,
+                                             loader))
 
-def show_account(root, login_screen):
+def open_account_screen(root, login_screen, shards, tasks, username, loader):
+    try:
+        account_data = loader.result("account_data")
+    except Exception as e:
+        login_screen.login_failed(f"Could not open your ledger: {e}")
+        return
     login_screen.destroy()
-    AccountScreen(root)
+    account_screen = AccountScreen(root, account_data, tasks=tasks)
+    account_screen.closed_callback = lambda: release_shard(shards, tasks, username)
+    timing.mark_when_idle(root, "account_ready")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,58 @@
+"""Coalesced redraws for Tk screens
+
+Components do not redraw when their data changes; they mark a render
+function dirty instead. One after_idle pass then calls every dirty render
+function once, so a burst of changes (an import, a sync) costs one redraw
+per component rather than one per change, and mutations never wait on Tk.
+"""
+
+
+def set_text(widget, text):
+    """Configure a widget's text only if it differs from what it shows"""
+    if getattr(widget, "_shown_text", None) != text:
+        widget.config(text=text)
+        widget._shown_text = text
+
+
+class RenderScheduler:
+    """
+    Redraw dirty components once per idle pass.
+
+    mark_dirty(render) queues a render callable (usually a bound method);
+    marking it again before the pass runs is free. Renders run in the
+    order they were first marked.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._dirty = {}
+        self._job = None
+
+    def mark_dirty(self, render):
+        self._dirty[render] = None
+        if self._job is None:
+            self._job = self.root.after_idle(self._idle_pass)
+
+    def _idle_pass(self):
+        self._job = None
+        self.flush()
+
+    def flush(self):
+        """Run every pending render now"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        while self._dirty:
+            # Renders may mark more work dirty; it runs in this pass too
+            dirty, self._dirty = self._dirty, {}
+            for render in dirty:
+                try:
+                    render()
+                except Exception as e:
+                    print(f"Error while redrawing: {e}")
+
+    def cancel(self):
+        """Drop pending renders, e.g. when the screen is destroyed"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self._dirty.clear()
@@ -0,0 +1,71 @@
+"""Check the import cost of the entry points against a budget
+
+Runs each entry module under `python -X importtime` in a fresh interpreter,
+fails if its cumulative import time exceeds the budget or if a module that
+should only load on first use (PIL, ttk, messagebox) was pulled in.
+
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 80 main
+    python scripts/check_import_time.py --forbid tkinter webabiq webabiq.cli
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["main", "run"]
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_FORBIDDEN = ["PIL", "tkinter.ttk", "tkinter.messagebox"]
+
+def measure(module):
+    """Return {imported module: (self_us, cumulative_us)} for `import module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def check(module, budget_ms, forbidden, top):
+    timings = measure(module)
+    total_ms = timings[module][1] / 1000
+    ok = total_ms <= budget_ms
+    print(f"{module}: {total_ms:.1f} ms (budget {budget_ms:.1f} ms)"
+          f"{'' if ok else '  OVER BUDGET'}")
+
+    for name in forbidden:
+        if name in timings:
+            ok = False
+            print(f"  {name} is imported eagerly ({timings[name][1] / 1000:.1f} ms)")
+
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_us, _) in slowest[:top]:
+        print(f"  {self_us / 1000:7.2f} ms  {name}")
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--forbid", action="append", default=None,
+                        help="module that must not be imported (repeatable)")
+    parser.add_argument("--top", type=int, default=5,
+                        help="show this many slowest imports")
+    args = parser.parse_args(argv)
+
+    forbidden = args.forbid if args.forbid is not None else DEFAULT_FORBIDDEN
+    results = [check(m, args.budget_ms, forbidden, args.top) for m in args.modules]
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
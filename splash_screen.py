@@ -1,11 +1,21 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from collections import OrderedDict
 import os
 
+# Wait this long after the last <Configure> before the high-quality pass
+RESIZE_SETTLE_MS = 150
+# Number of rendered logo sizes kept around
+LOGO_CACHE_SIZE = 4
+
 class SplashScreen(tk.Frame):
     def __init__(self, parent):
         tk.Frame.__init__(self, parent)
         self.parent = parent
+        self.logo_label = None
+        self.logo_size = None
+        self.logo_cache = OrderedDict()
+        self.settle_job = None
+        self.logo_job = None
         
         # Configure pink background
         self.configure(bg="#FFB6C1")
@@ -17,16 +27,20 @@ class SplashScreen(tk.Frame):
         # Bind resize event
         self.bind('<Configure>', self.on_resize)
         
-        # Create and display the logo
-        self.create_logo()
+        # Paint the plain splash first; PIL is only imported once Tk is idle
+        self.logo_job = self.after_idle(self.create_logo)
     
     def create_logo(self):
+        self.logo_job = None
         self.logo_path = os.path.join("assets/logo.png")
         
         if os.path.exists(self.logo_path):
             try:
-                # Load original image
+                from PIL import Image
+                
+                # Load original image, decoding it once up front
                 self.original_image = Image.open(self.logo_path)
+                self.original_image.load()
                 self.update_logo_size()
             except Exception as e:
                 print(f"Error loading image: {e}")
@@ -35,36 +49,75 @@ class SplashScreen(tk.Frame):
             print(f"Logo file not found at: {self.logo_path}")
             self.show_fallback_text()
     
-    def update_logo_size(self):
+    def update_logo_size(self, final=True):
         try:
             # Get current frame size
             frame_width = self.winfo_width()
             frame_height = self.winfo_height()
             
             if frame_width > 1 and frame_height > 1:  # Ensure valid dimensions
-                # Resize image to fill frame
-                resized_image = self.resize_image(self.original_image, (frame_width, frame_height))
-                photo = ImageTk.PhotoImage(resized_image)
-                
-                # Remove old label if exists
-                for widget in self.winfo_children():
-                    widget.destroy()
+                size = (frame_width, frame_height)
+                photo = self.cached_logo(size, final)
+                if photo is None:
+                    return
                 
-                # Create new label with updated image
-                logo_label = tk.Label(self, image=photo, bg="#FFB6C1")
-                logo_label.image = photo  # Keep a reference!
-                logo_label.pack(fill="both", expand=True)
+                if self.logo_label is None:
+                    self.logo_label = tk.Label(self, bg="#FFB6C1")
+                    self.logo_label.pack(fill="both", expand=True)
+                self.logo_label.config(image=photo)
+                self.logo_label.image = photo  # Keep a reference!
+                self.logo_size = (size, final)
         except Exception as e:
             print(f"Error updating logo size: {e}")
             self.show_fallback_text()
     
+    def cached_logo(self, size, final):
+        """
+        Get a PhotoImage of the logo scaled for size, rendering it if needed.
+        A draft render only happens when no high-quality one is cached.
+        """
+        from PIL import Image, ImageTk
+        
+        if self.logo_size in ((size, True), (size, final)):
+            return None
+        for key in ((size, True), (size, False)):
+            if key in self.logo_cache and (key[1] or not final):
+                self.logo_cache.move_to_end(key)
+                return self.logo_cache[key]
+        
+        resample = Image.Resampling.LANCZOS if final else Image.Resampling.NEAREST
+        photo = ImageTk.PhotoImage(self.resize_image(self.original_image, size, resample))
+        self.logo_cache[(size, final)] = photo
+        while len(self.logo_cache) > LOGO_CACHE_SIZE:
+            self.logo_cache.popitem(last=False)
+        return photo
+    
     def on_resize(self, event):
-        """Handle window resize events"""
+        """Handle window resize events: draft now, full quality once resizing stops"""
         if hasattr(self, 'original_image'):
-            self.update_logo_size()
+            self.update_logo_size(final=False)
+            if self.settle_job is not None:
+                self.after_cancel(self.settle_job)
+            self.settle_job = self.after(RESIZE_SETTLE_MS, self.on_resize_settled)
+    
+    def destroy(self):
+        for job in (self.settle_job, self.logo_job):
+            if job is not None:
+                self.after_cancel(job)
+        self.settle_job = self.logo_job = None
+        tk.Frame.destroy(self)
+    
+    def on_resize_settled(self):
+        self.settle_job = None
+        self.update_logo_size(final=True)
     
-    def resize_image(self, image, size):
+    def resize_image(self, image, size, resample=None):
         """Resize image to fill frame while maintaining aspect ratio"""
+        from PIL import Image
+        
+        if resample is None:
+            resample = Image.Resampling.LANCZOS
+        
         # Calculate target dimensions
         target_width, target_height = size
         original_width, original_height = image.size
@@ -77,13 +130,14 @@ class SplashScreen(tk.Frame):
         ratio = max(width_ratio, height_ratio)
         
         new_size = (int(original_width * ratio), int(original_height * ratio))
-        return image.resize(new_size, Image.Resampling.LANCZOS)
+        return image.resize(new_size, resample)
     
     def show_fallback_text(self):
         """Show fallback text when image cannot be loaded"""
         # Clear any existing widgets
         for widget in self.winfo_children():
             widget.destroy()
+        self.logo_label = None
             
         label = tk.Label(
             self,
@@ -1,35 +1,72 @@
 """Monthly statistics component"""
 import tkinter as tk
-from datetime import datetime, date, timedelta
+from datetime import date
+from account_data import month_range_label, shift_month
+from render_scheduler import set_text
 
 class MonthlyStats(tk.Frame):
+    """
+    Year, range and total of one month, with buttons to step to the
+    previous or next month. month_changed_callback(year, month) is called
+    when the user navigates; the owner answers with show_month(), and
+    reports later changes to the month with add_to_total().
+    """
     def __init__(self, parent):
         super().__init__(parent, bg="#E75480")
+        today = date.today()
+        self.month = (today.year, today.month)
+        self.total_cents = 0
+        self.month_changed_callback = None
+        self.render = None
         self.create_stats_view()
-    
+
     def create_stats_view(self):
-        # Year label
-        tk.Label(
-            self,
-            text=str(datetime.now().year),
+        # Year label with month navigation
+        year_frame = tk.Frame(self, bg="white")
+        year_frame.pack(fill="x", pady=5)
+
+        tk.Button(
+            year_frame,
+            text="<",
+            font=("Arial", 12, "bold"),
+            bg="white",
+            fg="#E75480",
+            relief="flat",
+            command=lambda: self.step(-1)
+        ).pack(side="left")
+
+        tk.Button(
+            year_frame,
+            text=">",
+            font=("Arial", 12, "bold"),
+            bg="white",
+            fg="#E75480",
+            relief="flat",
+            command=lambda: self.step(1)
+        ).pack(side="right")
+
+        self.year_label = tk.Label(
+            year_frame,
+            text=str(self.month[0]),
             font=("Arial", 14, "bold"),
             bg="white",
             fg="#E75480"
-        ).pack(fill="x", pady=5)
-        
+        )
+        self.year_label.pack(fill="x")
+
         # Monthly range and amount
         month_info_frame = tk.Frame(self, bg="#E75480")
         month_info_frame.pack(fill="x", pady=5)
-        
+
         self.monthly_range_label = tk.Label(
             month_info_frame,
-            text=self.get_monthly_range(),
+            text=month_range_label(*self.month),
             font=("Arial", 12),
             bg="#E75480",
             fg="white"
         )
         self.monthly_range_label.pack(side="left", padx=20)
-        
+
         self.monthly_amount_label = tk.Label(
             month_info_frame,
             text="$0.00",
@@ -38,21 +75,41 @@ class MonthlyStats(tk.Frame):
             fg="white"
         )
         self.monthly_amount_label.pack(side="right", padx=20)
-    
+
+    def step(self, delta):
+        """Move delta months back or forward"""
+        year, month = shift_month(*self.month, delta)
+        if self.month_changed_callback:
+            self.month_changed_callback(year, month)
+        else:
+            self.show_month(year, month)
+
+    def show_month(self, year, month, amount=None):
+        """Display a month; amount is its total, if known"""
+        if (year, month) != self.month:
+            self.month = (year, month)
+            set_text(self.year_label, str(year))
+            set_text(self.monthly_range_label, month_range_label(year, month))
+        if amount is not None:
+            self.update_stats(amount)
+
     def get_monthly_range(self):
         """Calculate the current month's date range"""
         today = date.today()
-        first_day = date(today.year, today.month, 1)
-        
-        # Calculate last day of current month
-        if today.month == 12:
-            next_month = date(today.year + 1, 1, 1)
-        else:
-            next_month = date(today.year, today.month + 1, 1)
-        last_day = (next_month - timedelta(days=1)).day
-        
-        return f"{today.month}/1 - {today.month}/{last_day}"
-    
+        return month_range_label(today.year, today.month)
+
     def update_stats(self, amount):
         """Update the monthly amount display"""
-        self.monthly_amount_label.config(text=f"${amount:.2f}")
\ No newline at end of file
+        self.total_cents = round(amount * 100)
+        self.render_total()
+
+    def add_to_total(self, cents):
+        """Apply a change to the month on display; redrawn on the next idle pass"""
+        self.total_cents += cents
+        if self.render is not None:
+            self.render.mark_dirty(self.render_total)
+        else:
+            self.render_total()
+
+    def render_total(self):
+        set_text(self.monthly_amount_label, f"${self.total_cents / 100:.2f}")
@@ -1,16 +1,43 @@
 """Transaction history component"""
 import tkinter as tk
 
+def format_transaction(transaction):
+    """Turn a transaction into the (date, amount, description) texts of a row"""
+    sign = "+" if transaction['category'] == "Income" else "-"
+    return (
+        transaction['date'].strftime("%Y-%m-%d"),
+        f"{sign}${transaction['amount']:.2f}",
+        transaction['description']
+    )
+
 class TransactionHistory(tk.Frame):
+    """
+    Scrollable history that only builds widgets for the rows on screen.
+    A fixed pool of row widgets, sized to the viewport, is rebound to
+    whichever slice of the data is scrolled into view.
+    
+    The data sequence is owned by the caller; after changing it, call
+    insert_row/update_row/remove_row. They only mark the view dirty: the
+    rows in view are rebound once per idle pass (through render, a
+    RenderScheduler, if the owner sets one), however many changes came in.
+    """
     def __init__(self, parent):
         super().__init__(parent, bg="#FFB6C1")
+        self.rows = []
+        self.formatter = None
+        self.row_selected_callback = None
+        self.render = None
+        self.top = 0
+        self.row_pool = []
+        self.row_height = None
+        self._refresh_pending = False
         self.create_history_view()
-    
+
     def create_history_view(self):
         # Headers
         headers_frame = tk.Frame(self, bg="#E75480")
         headers_frame.pack(fill="x", padx=20, pady=(20, 0))
-        
+
         headers = ["DATE", "INCOME/PAID", "DESCRIPTION"]
         for header in headers:
             tk.Label(
@@ -21,42 +48,173 @@ class TransactionHistory(tk.Frame):
                 fg="white",
                 width=15
             ).pack(side="left", padx=5, pady=5)
-        
+
         # Scrollable transaction list
-        self.transactions_frame = tk.Frame(self, bg="white")
-        self.transactions_frame.pack(fill="both", expand=True, padx=20)
-    
+        body = tk.Frame(self, bg="white")
+        body.pack(fill="both", expand=True, padx=20)
+
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        # The viewport takes its size from the layout, never from the pooled rows
+        self.transactions_frame = tk.Frame(body, bg="white")
+        self.transactions_frame.pack_propagate(False)
+        self.transactions_frame.pack(side="left", fill="both", expand=True)
+        self.transactions_frame.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.transactions_frame)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    def create_row(self):
+        """Build one pooled row: a frame holding date, amount and description labels"""
+        row = tk.Frame(self.transactions_frame, bg="white")
+        labels = []
+        for _ in range(3):
+            label = tk.Label(row, bg="white", width=15)
+            label.pack(side="left", padx=5)
+            self.bind_wheel(label)
+            label.bind("<Double-Button-1>", lambda e, r=row: self.on_row_selected(r))
+            labels.append(label)
+        self.bind_wheel(row)
+        row.labels = labels
+        row.texts = None
+        row.position = None
+        if self.row_height is None:
+            self.row_height = labels[0].winfo_reqheight() + 2
+        return row
+
+    def on_resize(self, event):
+        """Grow or shrink the row pool to cover the viewport"""
+        if self.row_height is None:
+            self.row_pool.append(self.create_row())
+        needed = max(1, -(-event.height // self.row_height))
+        while len(self.row_pool) < needed:
+            self.row_pool.append(self.create_row())
+        while len(self.row_pool) > needed:
+            self.row_pool.pop().destroy()
+        self.refresh()
+
+    def set_rows(self, rows, formatter=format_transaction):
+        """
+        Show a sequence of rows (anything supporting len() and indexing).
+        formatter maps an item to its (date, amount, description) texts.
+        """
+        self.rows = rows
+        self.formatter = formatter
+        self.top = 0
+        self.refresh()
+
     def clear_history(self):
         """Clear all transactions from the history view"""
-        for widget in self.transactions_frame.winfo_children():
-            widget.destroy()
-    
+        self.set_rows([], formatter=None)
+
     def add_transaction(self, date, amount, description):
         """Add a transaction to the history view"""
-        row = tk.Frame(self.transactions_frame, bg="white")
-        row.pack(fill="x", pady=1)
-        
-        # Date
-        tk.Label(
-            row,
-            text=date,
-            bg="white",
-            width=15
-        ).pack(side="left", padx=5)
-        
-        # Amount
-        tk.Label(
-            row,
-            text=amount,
-            bg="white",
-            width=15,
-            fg="#E75480" if amount.startswith("+") else "#666666"
-        ).pack(side="left", padx=5)
-        
-        # Description
-        tk.Label(
-            row,
-            text=description,
-            bg="white",
-            width=15
-        ).pack(side="left", padx=5)
\ No newline at end of file
+        if not isinstance(self.rows, list) or self.formatter is not None:
+            self.rows, self.formatter = [], None
+        self.rows.append((date, amount, description))
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        """Rebind the rows in view on the next idle pass"""
+        if self.render is not None:
+            self.render.mark_dirty(self.refresh)
+        elif not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def refresh(self):
+        """Rebind the pooled row widgets to the rows currently in view"""
+        self._refresh_pending = False
+        total = len(self.rows)
+        visible = len(self.row_pool)
+        self.top = max(0, min(self.top, total - visible))
+
+        for offset, row in enumerate(self.row_pool):
+            index = self.top + offset
+            if index >= total:
+                if row.texts is not None:
+                    row.pack_forget()
+                    row.texts = None
+                    row.position = None
+                continue
+            self.bind_row(row, index)
+
+        self.update_scrollbar()
+
+    def bind_row(self, row, index):
+        """Show rows[index] in a pooled row widget, touching only changed labels"""
+        item = self.rows[index]
+        texts = self.formatter(item) if self.formatter else item
+        row.position = index
+        if texts == row.texts:
+            return
+        date_label, amount_label, description_label = row.labels
+        old = row.texts or (None, None, None)
+        if texts[0] != old[0]:
+            date_label.config(text=texts[0])
+        if texts[1] != old[1]:
+            amount_label.config(
+                text=texts[1],
+                fg="#E75480" if texts[1].startswith("+") else "#666666"
+            )
+        if texts[2] != old[2]:
+            description_label.config(text=texts[2])
+        if row.texts is None:
+            row.pack(fill="x", pady=1)
+        row.texts = texts
+
+    def update_scrollbar(self):
+        total = len(self.rows)
+        visible = len(self.row_pool)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def insert_row(self, position, count=1):
+        """count rows were inserted into the data at position"""
+        # Keep whatever the user is looking at in place when scrolled down
+        if position < self.top:
+            self.top += count
+        self.schedule_refresh()
+
+    def update_row(self, position):
+        """The row at position changed in place"""
+        if 0 <= position - self.top < len(self.row_pool):
+            self.schedule_refresh()
+
+    def remove_row(self, position):
+        """The row at position was removed from the data"""
+        if position < self.top:
+            self.top -= 1
+        self.schedule_refresh()
+
+    def on_row_selected(self, row):
+        if row.position is not None and self.row_selected_callback:
+            self.row_selected_callback(row.position, self.rows[row.position])
+
+    def scroll_by(self, rows):
+        self.top += rows
+        self.refresh()
+
+    def on_wheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_by(-step)
+
+    def yview(self, *args):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(1, len(self.row_pool) - 1)
+            self.top += amount
+        self.refresh()
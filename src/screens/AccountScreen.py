@@ -111,11 +111,4 @@ class AccountScreen(tk.Frame):
         self.monthly_stats.update_stats(self.account_data.monthly_total)
         
         # Update history
-        self.history.clear_history()
-        for transaction in reversed(self.account_data.monthly_transactions):
-            sign = "+" if transaction['category'] == "Income" else "-"
-            self.history.add_transaction(
-                transaction['date'].strftime("%Y-%m-%d"),
-                f"{sign}${transaction['amount']:.2f}",
-                transaction['description']
-            )
\ No newline at end of file
+        self.history.set_rows(self.account_data.monthly_transactions[::-1])
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""Startup pipeline that prepares the app while the splash screen is showing"""
+import time
+from task_executor import TaskExecutor
+
+class StartupPipeline:
+    """
+    Run named startup tasks and call on_ready once all of them are done.
+
+    Background tasks run on the task executor's workers and must not touch
+    Tk; main-thread tasks run one per idle slot so the splash keeps painting
+    between them. Results (or the exception a task raised) are available
+    through result().
+    """
+    def __init__(self, root, min_display_ms: int = 0, tasks: TaskExecutor = None):
+        self.root = root
+        self.min_display_ms = min_display_ms
+        self.tasks = TaskExecutor(root) if tasks is None else tasks
+        self.background_tasks = []
+        self.main_tasks = []
+        self.results = {}
+        self.errors = {}
+        self._remaining = 0
+        self._on_ready = None
+        self._started_at = None
+
+    def add_background(self, name, func):
+        """Run func() on a worker thread"""
+        self.background_tasks.append((name, func))
+
+    def add_main(self, name, func, requires=()):
+        """
+        Run func() on the Tk thread, after the main tasks added before it
+        and once every task named in requires has finished.
+        """
+        self.main_tasks.append((name, func, tuple(requires)))
+
+    def start(self, on_ready):
+        self._on_ready = on_ready
+        self._started_at = time.monotonic()
+        self._remaining = len(self.background_tasks) + len(self.main_tasks)
+        if not self._remaining:
+            self._ready()
+            return
+
+        for name, func in self.background_tasks:
+            self.tasks.submit(
+                func,
+                on_done=lambda value, name=name: self._background_done(name, value),
+                on_error=lambda error, name=name: self._background_done(name, None, error)
+            )
+        self.root.after_idle(self._run_next_main)
+
+    def result(self, name):
+        """Get a finished task's return value, re-raising its exception if it failed"""
+        if name in self.errors:
+            raise self.errors[name]
+        return self.results[name]
+
+    def _background_done(self, name, value, error=None):
+        if error is None:
+            self.results[name] = value
+        else:
+            print(f"Startup task '{name}' failed: {error}")
+            self.errors[name] = error
+        self._task_finished()
+        self._run_next_main()
+
+    def _run_next_main(self):
+        if not self.main_tasks:
+            return
+        name, func, requires = self.main_tasks[0]
+        if any(r not in self.results and r not in self.errors for r in requires):
+            return  # retried as each background task finishes
+        self.main_tasks.pop(0)
+        try:
+            self.results[name] = func()
+        except Exception as e:
+            print(f"Startup task '{name}' failed: {e}")
+            self.errors[name] = e
+        self._task_finished()
+        self.root.after_idle(self._run_next_main)
+
+    def _task_finished(self):
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._ready()
+
+    def _ready(self):
+        # Everything is ready; honour the minimum splash time if one is set
+        elapsed_ms = (time.monotonic() - self._started_at) * 1000
+        delay = max(0, int(self.min_display_ms - elapsed_ms))
+        self.root.after(delay, self._on_ready)
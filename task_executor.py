@@ -0,0 +1,163 @@
+"""Worker pools for slow work, with results delivered on the Tk thread
+
+Tasks run on a thread pool (ledger queries, file I/O, scrypt and NumPy all
+release the GIL) or, for picklable CPU-bound Python, on a process pool that
+is only started the first time it is needed. Whatever they produce comes
+back through one queue that the Tk loop polls with after(), so callbacks
+always run on the Tk thread and widgets are never touched from a worker.
+"""
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# How often the Tk loop checks for finished tasks
+POLL_MS = 15
+# Worker threads shared by every screen
+THREAD_WORKERS = 4
+# Longest the Tk thread spends running delivered callbacks before it
+# yields to the event loop again
+DELIVERY_BUDGET_MS = 8
+
+
+class Task:
+    """Handle for submitted work; cancel() drops its result if it has not arrived"""
+    __slots__ = ("key", "on_done", "on_error", "future", "cancelled")
+
+    def __init__(self, key, on_done, on_error):
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Skip the callbacks; work that has not started yet is not run at all"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+
+class TaskExecutor:
+    """
+    Run functions off the Tk thread and call back on it.
+
+    submit() takes an optional key: submitting again with the same key
+    cancels the earlier task, so only the newest request for e.g. a month
+    or a login is answered. post() lets a running task hand intermediate
+    results (progress, parsed chunks) to the Tk thread in order.
+    """
+    def __init__(self, root, threads: int = THREAD_WORKERS, processes: int = None,
+                 poll_ms: int = POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.process_workers = processes
+        self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="task")
+        self._processes = None
+        self._delivered = queue.SimpleQueue()
+        self._latest = {}
+        self._pending = 0
+        self._poll_job = None
+        self._closed = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, key=None,
+               process: bool = False) -> Task:
+        """
+        Run func(*args) on a worker thread, or on a worker process if process
+        is set (func and args must then be picklable). on_done(result) or
+        on_error(exception) is later called on the Tk thread; errors without
+        an on_error handler are printed.
+        """
+        if self._closed:
+            raise RuntimeError("TaskExecutor is shut down")
+        task = Task(key, on_done, on_error)
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = task
+
+        pool = self._process_pool() if process else self._threads
+        task.future = pool.submit(func, *args)
+        task.future.add_done_callback(lambda future: self._delivered.put((task, None)))
+        self._pending += 1
+        self._schedule_poll()
+        return task
+
+    def post(self, callback, *args):
+        """
+        Call callback(*args) on the Tk thread; safe from any thread.
+        Meant for running tasks: posts are only picked up while one is pending,
+        and a task's posts are delivered before its own result.
+        """
+        self._delivered.put((callback, args))
+
+    def cancel(self, key):
+        """Cancel the newest task submitted with key, if it has not reported yet"""
+        task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        """Stop polling and cancel queued work; running tasks finish unobserved"""
+        self._closed = True
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    def _process_pool(self):
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._processes
+
+    def _schedule_poll(self, delay=None):
+        if self._poll_job is None and not self._closed:
+            self._poll_job = self.root.after(self.poll_ms if delay is None else delay,
+                                             self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        deadline = time.perf_counter() + DELIVERY_BUDGET_MS / 1000
+        while time.perf_counter() < deadline:
+            try:
+                item, args = self._delivered.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, Task):
+                self._pending -= 1
+                self._finish(item)
+            else:
+                self._call(item, *args)
+        else:
+            # Out of budget with results still queued; come back right away
+            self._schedule_poll(1)
+            return
+        if self._pending:
+            self._schedule_poll()
+
+    def _finish(self, task):
+        if self._latest.get(task.key) is task:
+            del self._latest[task.key]
+        if task.cancelled or task.future.cancelled():
+            return
+        error = task.future.exception()
+        if error is None:
+            if task.on_done:
+                self._call(task.on_done, task.future.result())
+        elif task.on_error:
+            self._call(task.on_error, error)
+        else:
+            print(f"Background task failed: {error}")
+
+    def _call(self, callback, *args):
+        # One failing callback must not stop the others from being delivered
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error in task callback: {e}")
@@ -0,0 +1,26 @@
+"""In-memory AccountData bookkeeping"""
+from datetime import datetime
+
+import pytest
+
+from account_data import AccountData, ConsistencyError
+
+
+def test_verify_totals_flags_stale_month_buckets():
+    account_data = AccountData()
+    account_data.add_transactions(
+        (10 + i, "Income" if i % 3 == 0 else "Paid", f"row {i}", datetime(2024, 1 + i, 1))
+        for i in range(12))
+    account_data.delete_transaction(4)
+    account_data.verify_totals()
+
+    # A month with no live rows behind it must be empty
+    stale = account_data._month_bucket(1999, 1, create=True)
+    account_data.verify_totals()
+    stale.income = 500
+    with pytest.raises(ConsistencyError):
+        account_data.verify_totals()
+    stale.income = 0
+    stale.writable_rows().append(0)
+    with pytest.raises(ConsistencyError):
+        account_data.verify_totals()
@@ -0,0 +1,107 @@
+"""Reopening ledger-backed AccountData: torn tails, compaction and snapshots"""
+import glob
+import os
+from datetime import datetime
+
+import pytest
+
+from account_data import AccountData
+from ledger import HEADER_SIZE, list_segments
+from ledger_snapshot import list_snapshots
+
+
+def live_rows(account_data):
+    """(id, cents, category, description, date) of every live row"""
+    store = account_data.transactions
+    return [(i, row.cents, row.category, row.description, row.date)
+            for i, row in ((i, store[i]) for i in range(len(store)))
+            if not row.deleted]
+
+
+def add_rows(account_data, count, description="row"):
+    account_data.add_transactions(
+        (10 + i, "Income" if i % 3 == 0 else "Paid", f"{description} {i}",
+         datetime(2024, 1 + i % 12, 1 + i % 28, 12))
+        for i in range(count))
+
+
+def reopen(path, before):
+    """Reopen path, check it matches before and its totals add up"""
+    account_data = AccountData(path)
+    assert live_rows(account_data) == before
+    account_data.verify_totals()
+    return account_data
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "ledger.wbq")
+
+
+def test_reopen_after_torn_tail(path):
+    account_data = AccountData(path)
+    add_rows(account_data, 50)
+    account_data.edit_transaction(3, 99.5, "Paid", "edited")
+    account_data.delete_transaction(7)
+    before = live_rows(account_data)
+    account_data.close()
+
+    # A crash in the middle of an append leaves part of a record behind
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x01\x02\x03\x04partial")
+
+    account_data = reopen(path, before)
+    assert os.path.getsize(path) == size
+    account_data.add_transaction(1.25, "Paid", "after the crash")
+    before = live_rows(account_data)
+    account_data.close()
+    reopen(path, before).close()
+
+
+def test_reopen_after_compaction(path):
+    account_data = AccountData(path)
+    add_rows(account_data, 200)
+    account_data.edit_transaction(5, 12.0, "Income", "before compaction")
+    account_data.delete_transaction(6)
+    account_data.compact().join()
+    assert list_segments(path) == [1]
+    assert [segment for segment, _ in list_snapshots(path)] == [1]
+    account_data.verify_totals()
+
+    # Changes to rows that now live in the snapshot replay on top of it
+    account_data.edit_transaction(10, 7.5, "Paid", "after compaction")
+    account_data.delete_transaction(11)
+    add_rows(account_data, 5, "tail")
+    before = live_rows(account_data)
+    account_data.close()
+
+    account_data = reopen(path, before)
+    assert account_data._snapshot_position == (1, HEADER_SIZE)
+    account_data.edit_transaction(12, 3.0, "Income", "edited snapshot row")
+    account_data.delete_transaction(0)
+    before = live_rows(account_data)
+    account_data.close()
+    reopen(path, before).close()
+
+
+def test_snapshot_from_another_ledger_is_rejected(path):
+    old = AccountData(path)
+    old.add_transactions([(25000, "Income", "OLD BOOK", datetime(2024, 1, 1))])
+    old.compact().join()
+    old.close()
+    for name in glob.glob(path) + glob.glob(path + ".[0-9]*"):
+        os.remove(name)
+    assert list_snapshots(path)
+
+    # A new book whose segment 1 sits next to the old book's snapshot 1
+    new = AccountData(path)
+    new.add_transaction(1, "Income", "NEW BOOK")
+    new.ledger.rotate()
+    before = live_rows(new)
+    new.close()
+
+    account_data = reopen(path, before)
+    assert account_data._snapshot_position is None
+    assert account_data.income == 1
+    account_data.close()
@@ -0,0 +1,27 @@
+"""UserDirectory staying in step with changes made by other processes"""
+from user_directory import UserDirectory
+
+
+def test_sees_changes_from_another_directory(tmp_path):
+    path = str(tmp_path / "users.db")
+    directory = UserDirectory.create(path, {"alice": "hash-a"})
+    assert "bob" not in directory
+
+    # Another process (the users CLI) appends to the log...
+    other = UserDirectory(path)
+    other.set_user("bob", "hash-b")
+    other.close()
+    assert directory["bob"] == "hash-b"
+
+    # ...and compacts, replacing the base file under the open mmap
+    other = UserDirectory(path)
+    other.set_user("carol", "hash-c")
+    other.compact()
+    other.remove_user("alice")
+    other.close()
+    assert "alice" not in directory
+    assert sorted(directory.items()) == [("bob", "hash-b"), ("carol", "hash-c")]
+
+    directory.set_user("dave", "hash-d")
+    assert len(directory) == 3
+    directory.close()
@@ -0,0 +1,106 @@
+"""Startup phase timers and a machine-readable time-to-interactive report
+
+Enable with WEBABIQ_TIMING=<path> (or =1 / =- for stdout), or pass
+--timing[=<path>] to the entry point. --timing-exit additionally quits as
+soon as the login screen is interactive, for unattended measurements.
+"""
+import atexit
+import json
+import os
+import sys
+import time
+
+# Reference point for every phase; import this module before anything heavy
+_START = time.perf_counter()
+
+SCHEMA_VERSION = 1
+
+class PhaseTimer:
+    def __init__(self):
+        self.enabled = False
+        self.output = None
+        self.exit_when_interactive = False
+        self.phases = {}
+        self._written = False
+
+    def configure(self, argv=None, environ=None):
+        """Turn timing on from --timing[=path] / --timing-exit or WEBABIQ_TIMING"""
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+
+        output = environ.get("WEBABIQ_TIMING") or None
+        for arg in argv[1:]:
+            if arg == "--timing":
+                output = output or "-"
+            elif arg.startswith("--timing="):
+                output = arg.split("=", 1)[1]
+            elif arg == "--timing-exit":
+                output = output or "-"
+                self.exit_when_interactive = True
+        if output in ("1", "true", "yes"):
+            output = "-"
+
+        self.enabled = output is not None
+        self.output = output
+        if self.enabled:
+            atexit.register(self.write)
+
+    def mark(self, phase):
+        """Record the time since start at which phase was reached (first time only)"""
+        if self.enabled and phase not in self.phases:
+            self.phases[phase] = (time.perf_counter() - _START) * 1000
+
+    def mark_on_event(self, widget, sequence, phase):
+        """Mark phase the first time widget receives sequence, e.g. '<Expose>'"""
+        if not self.enabled:
+            return
+        widget.bind(sequence, lambda event: self.mark(phase), add="+")
+
+    def mark_when_idle(self, widget, phase, then=None):
+        """Mark phase once Tk has drained pending layout and redraw work"""
+        if not self.enabled:
+            return
+        def handler():
+            self.mark(phase)
+            if then is not None:
+                then()
+        widget.after_idle(handler)
+
+    def report(self):
+        import platform
+        
+        durations = {}
+        previous = 0.0
+        for phase, at in sorted(self.phases.items(), key=lambda item: item[1]):
+            durations[phase] = round(at - previous, 3)
+            previous = at
+        return {
+            "schema": SCHEMA_VERSION,
+            "entry_point": os.path.basename(sys.argv[0]) if sys.argv else None,
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "machine": platform.node(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "phases_ms": {p: round(t, 3) for p, t in self.phases.items()},
+            "durations_ms": durations,
+            "time_to_interactive_ms": (round(self.phases["login_ready"], 3)
+                                       if "login_ready" in self.phases else None),
+        }
+
+    def write(self):
+        """Emit the JSON report once, to stdout or the configured path"""
+        if not self.enabled or self._written:
+            return
+        self._written = True
+        data = json.dumps(self.report(), indent=2)
+        if self.output == "-":
+            print(data)
+        else:
+            with open(self.output, "w", encoding="utf-8") as f:
+                f.write(data + "\n")
+
+timer = PhaseTimer()
+configure = timer.configure
+mark = timer.mark
+mark_on_event = timer.mark_on_event
+mark_when_idle = timer.mark_when_idle
@@ -0,0 +1,328 @@
+"""Column-oriented storage for transactions"""
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import chain, compress
+from ledger import EPOCH
+
+# Category codes that are always present, in this order
+INCOME = 0
+PAID = 1
+# Category code marking a deleted row
+DELETED = 0xFF
+
+_EPOCH_ORDINAL = EPOCH.toordinal()
+
+
+def to_timestamp(when: datetime) -> int:
+    """Convert a naive datetime to wall-clock seconds since EPOCH"""
+    delta = when - EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def from_timestamp(timestamp: int) -> datetime:
+    """Convert wall-clock seconds since EPOCH back to a datetime"""
+    return EPOCH + timedelta(seconds=timestamp)
+
+
+def month_of(timestamp: int):
+    """Get the (year, month) a timestamp falls in"""
+    day = date.fromordinal(_EPOCH_ORDINAL + timestamp // 86400)
+    return day.year, day.month
+
+
+def to_cents(amount: float) -> int:
+    return round(amount * 100)
+
+
+class Column:
+    """
+    A typed column split in two: a fixed-length base buffer (a memoryview,
+    e.g. over a memory-mapped snapshot) followed by a growable array.
+    Supports the subset of the array API the store uses.
+    """
+    __slots__ = ('base', 'tail', '_split')
+
+    def __init__(self, base, typecode):
+        self.base = base
+        self.tail = array(typecode)
+        self._split = len(base)
+
+    @property
+    def typecode(self):
+        return self.tail.typecode
+
+    def parts(self):
+        """The base buffer and the tail array, in row order"""
+        return self.base, self.tail
+
+    def __len__(self):
+        return self._split + len(self.tail)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index < self._split:
+            return self.base[index]
+        return self.tail[index - self._split]
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += len(self)
+        if index < self._split:
+            self.base[index] = value
+        else:
+            self.tail[index - self._split] = value
+
+    def __iter__(self):
+        return chain(self.base, self.tail)
+
+    def append(self, value):
+        self.tail.append(value)
+
+    def extend(self, values):
+        self.tail.extend(values)
+
+
+def column_parts(column):
+    """Buffers making up a column, in row order (one for a plain array)"""
+    return column.parts() if isinstance(column, Column) else (column,)
+
+
+class Transaction:
+    """Read-only view of one row, usable like the old transaction dict"""
+    __slots__ = ('_store', 'id')
+
+    def __init__(self, store, index):
+        self._store = store
+        self.id = index
+
+    @property
+    def amount(self):
+        return self._store.amounts[self.id] / 100
+
+    @property
+    def cents(self):
+        return self._store.amounts[self.id]
+
+    @property
+    def category(self):
+        return self._store.category_names[self._store.categories[self.id]]
+
+    @property
+    def description(self):
+        return self._store.description(self._store.descriptions[self.id])
+
+    @property
+    def date(self):
+        return from_timestamp(self._store.timestamps[self.id])
+
+    @property
+    def deleted(self):
+        return self._store.categories[self.id] == DELETED
+
+    def keys(self):
+        return ('amount', 'category', 'description', 'date')
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.keys() else default
+
+    def __eq__(self, other):
+        return (isinstance(other, Transaction) and other._store is self._store
+                and other.id == self.id)
+
+    def __hash__(self):
+        return hash((id(self._store), self.id))
+
+    def __repr__(self):
+        return (f"Transaction(id={self.id}, amount={self.amount:.2f}, "
+                f"category={self.category!r}, description={self.description!r}, "
+                f"date={self.date:%Y-%m-%d %H:%M:%S})")
+
+
+class TransactionStore:
+    """
+    Transactions held as parallel typed arrays.
+    Row i is (amounts[i] cents, timestamps[i] seconds, categories[i] code,
+    descriptions[i] code). Description text lives in one utf-8 blob.
+    Row indices are permanent ids: deleting a row only marks it DELETED,
+    and iterating skips such rows.
+    """
+
+    def __init__(self):
+        self.amounts = array('q')
+        self.timestamps = array('q')
+        self.categories = array('B')
+        self.descriptions = array('I')
+
+        # Interned category names
+        self.category_names = []
+        self._category_codes = {}
+        self.category_code('Income')
+        self.category_code('Paid')
+
+        # Description table: entry k is text[_text_offsets[k]:_text_offsets[k + 1]]
+        # where text is _text_base (loaded from a snapshot) followed by _text
+        self._text_base = b""
+        self._text = bytearray()
+        self._text_offsets = array('Q', [0])
+
+    @classmethod
+    def from_columns(cls, amounts, timestamps, categories, category_names,
+                     text, text_offsets):
+        """
+        Build a store around existing columns, one description per row:
+        row i's text is text[text_offsets[i]:text_offsets[i + 1]].
+        """
+        store = cls()
+        store.amounts = amounts
+        store.timestamps = timestamps
+        store.categories = categories
+        for name in category_names:
+            store.category_code(name)
+        store._text = bytearray(text)
+        store._text_offsets = text_offsets
+        store.descriptions = array('I', range(len(amounts)))
+        return store
+
+    @classmethod
+    def from_segments(cls, amounts, timestamps, categories, descriptions,
+                      category_names, text, text_offsets):
+        """
+        Build a store on top of fixed base buffers (memoryviews), which are
+        only read when rows are accessed. New rows go to in-memory arrays;
+        edits write through the base views, so these must be writable
+        (a copy-on-write mapping leaves the file itself untouched).
+        """
+        store = cls()
+        store.amounts = Column(amounts, 'q')
+        store.timestamps = Column(timestamps, 'q')
+        store.categories = Column(categories, 'B')
+        store.descriptions = Column(descriptions, 'I')
+        for name in category_names:
+            store.category_code(name)
+        store._text_base = text
+        store._text_offsets = Column(text_offsets, 'Q')
+        return store
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.amounts)
+        if not 0 <= index < len(self.amounts):
+            raise IndexError("transaction index out of range")
+        return Transaction(self, index)
+
+    def __iter__(self):
+        for index, code in enumerate(self.categories):
+            if code != DELETED:
+                yield Transaction(self, index)
+
+    def category_code(self, name: str) -> int:
+        """Get (creating if needed) the code for a category name"""
+        code = self._category_codes.get(name)
+        if code is None:
+            code = len(self.category_names)
+            if code >= DELETED:
+                raise ValueError("Too many distinct categories")
+            self.category_names.append(name)
+            self._category_codes[name] = code
+        return code
+
+    def add_description(self, text: str) -> int:
+        """Store description text and return its code"""
+        self._text += text.encode('utf-8')
+        self._text_offsets.append(len(self._text_base) + len(self._text))
+        return len(self._text_offsets) - 2
+
+    def description_bytes(self, code: int) -> bytes:
+        """utf-8 text of a description code"""
+        start = self._text_offsets[code]
+        end = self._text_offsets[code + 1]
+        base = len(self._text_base)
+        if end <= base and start < base:
+            return bytes(self._text_base[start:end])
+        return bytes(self._text[start - base:end - base])
+
+    def description(self, code: int) -> str:
+        return self.description_bytes(code).decode('utf-8')
+
+    def text_table(self):
+        """Description text blob parts and the offsets column, for snapshots"""
+        return (self._text_base, self._text), self._text_offsets
+
+    def append(self, cents: int, timestamp: int, category: str,
+               description: str) -> int:
+        """Append a row and return its index"""
+        # Check everything that can fail before the first column changes,
+        # so a bad row never leaves the columns different lengths
+        code = self.category_code(category)
+        array('q', (cents, timestamp))
+        self.amounts.append(cents)
+        self.timestamps.append(timestamp)
+        self.categories.append(code)
+        self.descriptions.append(self.add_description(description))
+        return len(self.amounts) - 1
+
+    def extend(self, cents, timestamps, categories, descriptions) -> int:
+        """
+        Append parallel lists of column values; returns the first new index.
+        All new columns are built first, so if any value does not fit (an
+        amount beyond int64 cents, say) the store is left unchanged.
+        """
+        first = len(self.amounts)
+        new_amounts = array('q', cents)
+        new_timestamps = array('q', timestamps)
+        new_categories = array('B', map(self.category_code, categories))
+        encoded = [text.encode('utf-8') for text in descriptions]
+
+        first_code = len(self._text_offsets) - 1
+        end = len(self._text_base) + len(self._text)
+        offsets = array('Q')
+        for data in encoded:
+            end += len(data)
+            offsets.append(end)
+        self.amounts.extend(new_amounts)
+        self.timestamps.extend(new_timestamps)
+        self.categories.extend(new_categories)
+        self._text += b"".join(encoded)
+        self._text_offsets.extend(offsets)
+        self.descriptions.extend(range(first_code, first_code + len(encoded)))
+        return first
+
+    def update(self, index: int, cents: int, category: str, description: str):
+        """Overwrite the amount, category and description of a row"""
+        self.amounts[index] = cents
+        self.categories[index] = self.category_code(category)
+        if description != self.description(self.descriptions[index]):
+            self.descriptions[index] = self.add_description(description)
+
+    def delete(self, index: int):
+        self.categories[index] = DELETED
+
+    def select(self, ids, start: int = None, end: int = None, category: int = None):
+        """
+        Filter row ids by timestamp (start <= t < end) and category code,
+        dropping deleted rows. Returns the matching ids in input order.
+        """
+        timestamps = self.timestamps
+        categories = self.categories
+        if category is None:
+            wanted = (categories[i] != DELETED for i in ids)
+        else:
+            wanted = (categories[i] == category for i in ids)
+        if start is None and end is None:
+            return list(compress(ids, wanted))
+        start = -(1 << 63) if start is None else start
+        end = (1 << 63) - 1 if end is None else end
+        return [i for i in compress(ids, wanted) if start <= timestamps[i] < end]
+
+    def sum_category(self, code: int) -> int:
+        """Sum of amounts (in cents) for one category code"""
+        return sum(compress(self.amounts, map(code.__eq__, self.categories)))
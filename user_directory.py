@@ -0,0 +1,269 @@
+"""File-backed user directory: username -> password hash
+
+The directory is a compacted base file plus an append-only change log.
+The base file holds a fixed-width index sorted by username, so a lookup
+is a binary search over an mmap that only touches O(log n) pages; no user
+is loaded into memory until it is asked for. Adding or removing a user
+appends one line to the log, and compact() merges the log into a new base
+file once it grows past COMPACT_THRESHOLD entries.
+
+Other processes (`python -m webabiq users ...`) may change the files while
+the app has them open; every lookup first checks both files' identity,
+size and mtime and reloads whichever changed.
+
+Base file layout:
+    header: magic, format version, user count
+    index:  count x (record offset, record length), sorted by username
+    records: utf-8 'username\\0hash' byte strings
+"""
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Mapping
+
+MAGIC = b"WBQU"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHQ")
+_ENTRY = struct.Struct("<QI")
+
+# Compact once the change log holds this many entries
+COMPACT_THRESHOLD = 1000
+
+
+class UserDirectoryError(Exception):
+    """Raised when a user directory file cannot be read"""
+
+
+def _stamp(path):
+    """Identity, size and mtime of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _check_username(username):
+    if not username or any(c in username for c in "\0\t\n"):
+        raise ValueError(f"Invalid username {username!r}")
+
+
+class UserDirectory(Mapping):
+    """Read-mostly mapping of username to password hash, backed by files"""
+
+    def __init__(self, path):
+        self.path = path
+        self.log_path = path + ".log"
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._count = 0
+        # Changes not yet compacted: username -> hash, or None once removed
+        self._changes = {}
+        self._log_entries = 0
+        self._base_stamp = None
+        self._log_stamp = None
+        self._open_base()
+        self._load_log()
+
+    def _refresh(self):
+        """Reload the base file or log if another process changed them (lock held)"""
+        if _stamp(self.path) != self._base_stamp:
+            self._open_base()
+        if _stamp(self.log_path) != self._log_stamp:
+            self._load_log()
+
+    def _open_base(self):
+        self._close_base()
+        # Stamped before reading, so a change made meanwhile is seen next time
+        self._base_stamp = _stamp(self.path)
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self._count = 0
+            return
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise UserDirectoryError(f"{self.path} is truncated")
+        magic, version, count = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise UserDirectoryError(f"{self.path} is not a user directory")
+        if version != VERSION:
+            raise UserDirectoryError(f"Unsupported user directory version {version}")
+        if len(self._map) < _HEADER.size + count * _ENTRY.size:
+            raise UserDirectoryError(f"{self.path} is truncated")
+        self._count = count
+
+    def _close_base(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+
+    def _load_log(self):
+        """Read the change log; a torn last line from a crash is ignored"""
+        self._changes = {}
+        self._log_entries = 0
+        self._log_stamp = _stamp(self.log_path)
+        if self._log_stamp is None:
+            return
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                text = line[:-1].decode("utf-8")
+                if text.startswith("+"):
+                    username, _, password_hash = text[1:].partition("\t")
+                    self._changes[username] = password_hash
+                elif text.startswith("-"):
+                    self._changes[text[1:]] = None
+                self._log_entries += 1
+
+    def _record(self, position):
+        offset, length = _ENTRY.unpack_from(self._map, _HEADER.size + position * _ENTRY.size)
+        return self._map[offset:offset + length]
+
+    def _find(self, key: bytes):
+        """Binary search the base index; returns the stored hash or None"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            username, _, password_hash = self._record(middle).partition(b"\0")
+            if username < key:
+                low = middle + 1
+            elif username > key:
+                high = middle
+            else:
+                return password_hash.decode("utf-8")
+        return None
+
+    def _base_items(self):
+        for position in range(self._count):
+            username, _, password_hash = self._record(position).partition(b"\0")
+            yield username.decode("utf-8"), password_hash.decode("utf-8")
+
+    def __getitem__(self, username):
+        with self._lock:
+            self._refresh()
+            if username in self._changes:
+                password_hash = self._changes[username]
+            elif self._map is not None:
+                password_hash = self._find(username.encode("utf-8"))
+            else:
+                password_hash = None
+        if password_hash is None:
+            raise KeyError(username)
+        return password_hash
+
+    def __iter__(self):
+        for username, _ in self.items():
+            yield username
+
+    def __len__(self):
+        # Walks every user; lookups never need it
+        return sum(1 for _ in self.items())
+
+    def items(self):
+        """Every (username, hash) in username order, as currently on disk"""
+        with self._lock:
+            self._refresh()
+            return list(self._merged_items())
+
+    def _merged_items(self):
+        """Merge the sorted base file with the pending changes, in username order"""
+        changes = sorted(self._changes.items(), key=lambda item: item[0].encode("utf-8"))
+        base = self._base_items()
+        pending = iter(changes)
+        current = next(base, None)
+        change = next(pending, None)
+        while current is not None or change is not None:
+            if change is None or (current is not None
+                                  and current[0].encode("utf-8") < change[0].encode("utf-8")):
+                yield current
+                current = next(base, None)
+                continue
+            if current is not None and current[0] == change[0]:
+                current = next(base, None)
+            if change[1] is not None:
+                yield change
+            change = next(pending, None)
+
+    def set_user(self, username, password_hash):
+        """Add a user or replace their password hash"""
+        _check_username(username)
+        if "\n" in password_hash or "\t" in password_hash:
+            raise ValueError("Invalid password hash")
+        self._append(f"+{username}\t{password_hash}\n", username, password_hash)
+
+    def remove_user(self, username):
+        if username not in self:
+            raise KeyError(username)
+        self._append(f"-{username}\n", username, None)
+
+    def _append(self, line, username, password_hash):
+        with self._lock:
+            self._refresh()
+            with open(self.log_path, "ab") as f:
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._changes[username] = password_hash
+            self._log_entries += 1
+            compact = self._log_entries >= COMPACT_THRESHOLD
+        if compact:
+            self.compact()
+
+    def compact(self):
+        """Write the merged users to a new base file and empty the change log"""
+        with self._lock:
+            self._refresh()
+            temp_path = self.path + ".tmp"
+            records = [f"{username}\0{password_hash}".encode("utf-8")
+                       for username, password_hash in self._merged_items()]
+            with open(temp_path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, len(records)))
+                offset = _HEADER.size + len(records) * _ENTRY.size
+                for record in records:
+                    f.write(_ENTRY.pack(offset, len(record)))
+                    offset += len(record)
+                f.writelines(records)
+                f.flush()
+                os.fsync(f.fileno())
+            self._close_base()
+            os.replace(temp_path, self.path)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._open_base()
+            self._load_log()
+
+    def close(self):
+        self._close_base()
+
+    @classmethod
+    def create(cls, path, users):
+        """Build a directory at path from a {username: hash} mapping"""
+        for name in (path, path + ".log"):
+            if os.path.exists(name):
+                os.remove(name)
+        directory = cls(path)
+        for username, password_hash in users.items():
+            _check_username(username)
+            directory._changes[username] = password_hash
+        directory.compact()
+        return directory
+
+
+def open_user_directory(path=None, seed=None):
+    """
+    Open the configured user directory, creating it from config.CREDENTIALS
+    the first time (only then; later users come from `python -m webabiq
+    users`). Safe to call off the Tk thread.
+    """
+    from config import USERS_PATH, CREDENTIALS
+
+    path = USERS_PATH if path is None else path
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return UserDirectory.create(path, CREDENTIALS if seed is None else seed)
+    return UserDirectory(path)
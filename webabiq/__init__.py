@@ -0,0 +1,45 @@
+"""Tk-free core of Webabiq: ledger-backed account data, import, export and reports
+
+Nothing here imports tkinter or PIL, and names are only loaded on first
+use, so `import webabiq` costs next to nothing and scripts pay only for
+what they touch (reports are the only part that needs NumPy).
+
+    import webabiq
+    account = webabiq.AccountData("data/ledger.wbq")
+
+The command line front end lives in webabiq.cli (`python -m webabiq`).
+"""
+import importlib
+
+# Public name -> flat module that defines it
+_EXPORTS = {
+    "AccountData": "account_data",
+    "ConsistencyError": "account_data",
+    "Ledger": "ledger",
+    "LedgerError": "ledger",
+    "TransactionStore": "transaction_store",
+    "EventBus": "events",
+    "LedgerShards": "ledger_shards",
+    "shard_path": "ledger_shards",
+    "ImportFileError": "importers",
+    "ImportStats": "importers",
+    "read_file": "importers",
+    "export": "exporters",
+    "load_columns": "exporters",
+    "Analytics": "analytics",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'webabiq' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
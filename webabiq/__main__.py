@@ -0,0 +1,4 @@
+import sys
+from webabiq.cli import main
+
+sys.exit(main())
@@ -0,0 +1,312 @@
+"""Headless command line for batch ledger work: python -m webabiq <command>
+
+    python -m webabiq --user alice add 12.50 Paid "Lunch" --date 2024-05-01
+    python -m webabiq --user alice add --stdin < entries.csv
+    python -m webabiq --user alice import statement.ofx bank.csv
+    python -m webabiq --user alice export 2024.csv --start 2024-01-01 --end 2025-01-01
+    python -m webabiq --user alice query --category Paid --limit 20 --format jsonl
+    python -m webabiq --ledger book.wbq report --period month --start 2024-01-01
+    python -m webabiq users add alice                 (prompts for the password)
+    python -m webabiq users remove alice
+
+Ledger commands need --user, for the ledger that user sees after logging
+in, or --ledger naming a file. A ledger the app has open is locked and
+cannot be written here until the app lets go of it. Date ranges include
+start and exclude end. The users commands edit the login directory at
+config.USERS_PATH.
+Exit status is 0 on success, 1 if anything failed or rows were skipped.
+"""
+import argparse
+import csv
+import getpass
+import json
+import os
+import sys
+from datetime import datetime
+from importers import CATEGORIES
+
+
+def parse_day(text):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}")
+
+
+def parse_cli_amount(text):
+    """argparse type for amounts, with the same checks as imports"""
+    from importers import parse_amount
+
+    try:
+        return parse_amount(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def ledger_path(args):
+    from config import LEDGER_DIR
+    from ledger_shards import shard_path
+
+    if args.ledger:
+        return args.ledger
+    return shard_path(LEDGER_DIR, args.user)
+
+
+def read_entries(lines, stats):
+    """Yield (amount, category, description, date) rows from CSV lines, skipping bad ones"""
+    from importers import parse_amount, signed_row
+
+    for number, row in enumerate(csv.reader(lines), 1):
+        if not row or (number == 1 and row[0].strip().lower() == "amount"):
+            continue
+        stats.rows += 1
+        try:
+            if len(row) not in (3, 4):
+                raise ValueError("expected amount,category,description[,date]")
+            amount = parse_amount(row[0])
+            when = datetime.fromisoformat(row[3].strip()) if len(row) == 4 else None
+            if when is not None and when.tzinfo is not None:
+                # The ledger keeps naive local times, like datetime.now()
+                when = when.astimezone().replace(tzinfo=None)
+            yield signed_row(amount, row[2], when, row[1].strip())
+        except (ValueError, OverflowError) as e:
+            stats.skip(f"line {number}", e)
+
+
+def report_skipped(where, stats):
+    if stats.skipped:
+        print(f"{where}: skipped {stats.skipped} rows", file=sys.stderr)
+        for error in stats.errors:
+            print(f"  {error}", file=sys.stderr)
+
+
+def cmd_add(account_data, args):
+    from importers import ImportStats
+
+    stats = ImportStats()
+    if args.stdin:
+        rows = read_entries(sys.stdin, stats)
+    elif args.amount is None or args.category is None or args.description is None:
+        print("add needs AMOUNT CATEGORY DESCRIPTION, or --stdin", file=sys.stderr)
+        return 1
+    else:
+        rows = [(args.amount, args.category, args.description, args.date)]
+    added = account_data.add_transactions(rows)
+    print(f"Added {added} transactions")
+    report_skipped("stdin", stats)
+    return 1 if stats.skipped else 0
+
+
+def cmd_import(account_data, args):
+    import importers
+
+    status = 0
+    for path in args.files:
+        stats = importers.ImportStats()
+        try:
+            added = account_data.add_transactions(importers.read_file(path, stats))
+        except (OSError, importers.ImportFileError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{path}: imported {added} transactions")
+        report_skipped(path, stats)
+        if stats.skipped:
+            status = 1
+    return status
+
+
+def cmd_export(account_data, args):
+    import exporters
+
+    try:
+        written = exporters.export(account_data, args.file, args.start, args.end,
+                                   args.category)
+    except (OSError, ValueError) as e:
+        print(f"{args.file}: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {written} transactions to {args.file}")
+    return 0
+
+
+def cmd_query(account_data, args):
+    from exporters import COLUMNS, iter_rows
+
+    ids = account_data.select(args.start, args.end, args.category)
+    if args.limit is not None:
+        ids = ids[-args.limit:] if args.limit else []
+    rows = iter_rows(account_data.transactions, ids)
+    out = sys.stdout
+    if args.format == "csv":
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    elif args.format == "jsonl":
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        for i, when, category, description, amount in rows:
+            out.write(encode({"id": i, "date": when, "category": category,
+                              "description": description, "amount": float(amount)}) + "\n")
+    else:
+        for i, when, category, description, amount in rows:
+            out.write(f"{i:>8}  {when}  {category:<7} {amount:>12}  {description}\n")
+    return 0
+
+
+def cmd_report(account_data, args):
+    try:
+        from analytics import Analytics
+    except ImportError as e:
+        print(f"report needs NumPy ({e})", file=sys.stderr)
+        return 1
+
+    analytics = Analytics.for_account(account_data)
+    if args.by_category:
+        for name, cents in analytics.by_category(args.start, args.end).items():
+            print(f"{name:<10} {cents / 100:>14.2f}")
+        return 0
+
+    totals = analytics.totals(args.period, args.start, args.end)
+    print(f"{args.period:<10} {'income':>14} {'paid':>14} {'net':>14}")
+    for start, income, paid in zip(totals.starts, totals.income, totals.paid):
+        print(f"{str(start):<10} {income / 100:>14.2f} {paid / 100:>14.2f} "
+              f"{(income - paid) / 100:>14.2f}")
+    income, paid = int(totals.income.sum()), int(totals.paid.sum())
+    print(f"{'total':<10} {income / 100:>14.2f} {paid / 100:>14.2f} "
+          f"{(income - paid) / 100:>14.2f}")
+    return 0
+
+
+def read_password(args):
+    if args.password_stdin:
+        return sys.stdin.readline().rstrip("\n")
+    password = getpass.getpass("Password: ")
+    if getpass.getpass("Repeat password: ") != password:
+        raise ValueError("passwords do not match")
+    return password
+
+
+def cmd_users(args):
+    from auth_utils import hash_password
+    from user_directory import UserDirectoryError, open_user_directory
+
+    try:
+        directory = open_user_directory()
+    except (OSError, UserDirectoryError) as e:
+        print(f"Could not open the user directory: {e}", file=sys.stderr)
+        return 1
+    try:
+        if args.action == "list":
+            for username in directory:
+                print(username)
+        elif args.action == "add":
+            password = read_password(args)
+            if not password:
+                raise ValueError("empty password")
+            directory.set_user(args.username, hash_password(password))
+            print(f"Saved user {args.username}")
+        else:
+            directory.remove_user(args.username)
+            print(f"Removed user {args.username}")
+    except ValueError as e:
+        print(f"{args.username}: {e}", file=sys.stderr)
+        return 1
+    except KeyError:
+        print(f"No such user: {args.username}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Could not update the user directory: {e}", file=sys.stderr)
+        return 1
+    finally:
+        directory.close()
+    return 0
+
+
+def add_range_options(parser):
+    parser.add_argument("--start", type=parse_day, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=parse_day, help="day after the last (YYYY-MM-DD)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="webabiq", description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]))
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--ledger", help="ledger file to use")
+    where.add_argument("--user", help="use this user's ledger shard")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add one transaction, or many from stdin")
+    add.add_argument("amount", nargs="?", type=parse_cli_amount)
+    add.add_argument("category", nargs="?", choices=CATEGORIES)
+    add.add_argument("description", nargs="?")
+    add.add_argument("--date", type=parse_day, help="date (default: now)")
+    add.add_argument("--stdin", action="store_true",
+                     help="read amount,category,description[,date] CSV lines from stdin")
+    add.set_defaults(run=cmd_add)
+
+    import_ = commands.add_parser("import", help="import bank exports (CSV, OFX, QIF)")
+    import_.add_argument("files", nargs="+")
+    import_.set_defaults(run=cmd_import)
+
+    export = commands.add_parser("export", help="export to .csv, .jsonl or .wbqc")
+    export.add_argument("file")
+    add_range_options(export)
+    export.add_argument("--category", choices=CATEGORIES)
+    export.set_defaults(run=cmd_export)
+
+    query = commands.add_parser("query", help="print matching transactions")
+    add_range_options(query)
+    query.add_argument("--category", choices=CATEGORIES)
+    query.add_argument("--limit", type=int, help="only the last N matches")
+    query.add_argument("--format", choices=("table", "csv", "jsonl"), default="table")
+    query.set_defaults(run=cmd_query)
+
+    report = commands.add_parser("report", help="income, paid and net per period")
+    add_range_options(report)
+    report.add_argument("--period", choices=("day", "week", "month", "year"),
+                        default="month")
+    report.add_argument("--by-category", action="store_true",
+                        help="totals per category instead of per period")
+    report.set_defaults(run=cmd_report)
+
+    users = commands.add_parser("users", help="add, remove or list login users")
+    actions = users.add_subparsers(dest="action", required=True)
+    add_user = actions.add_parser("add", help="add a user or change their password")
+    add_user.add_argument("username")
+    add_user.add_argument("--password-stdin", action="store_true",
+                          help="read the password from the first line of stdin")
+    remove_user = actions.add_parser("remove", help="remove a user")
+    remove_user.add_argument("username")
+    actions.add_parser("list", help="list usernames")
+    users.set_defaults(run=cmd_users)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "users":
+        return args.run(args)
+    if not args.ledger and not args.user:
+        parser.error(f"{args.command} needs --user USER or --ledger FILE")
+
+    from account_data import AccountData
+    from config import CHECK_CONSISTENCY
+    from ledger import LedgerError
+
+    try:
+        account_data = AccountData(ledger_path(args), check_consistency=CHECK_CONSISTENCY)
+    except (OSError, LedgerError) as e:
+        print(f"Could not open the ledger: {e}", file=sys.stderr)
+        return 1
+    try:
+        return args.run(account_data, args)
+    except BrokenPipeError:
+        # The reader went away, e.g. `python -m webabiq query | head`;
+        # keep the interpreter from failing to flush stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        account_data.close()